@@ -1,13 +1,24 @@
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, Response, jsonify, send_from_directory, request, stream_with_context
 from flask_cors import CORS
 import os
 import json
+import itertools
 from datetime import datetime
 from portal_config import (
     get_portals_list, get_projects_dict, add_new_portal, remove_portal, update_portal_status,
     discover_levels, get_level_metadata, create_level_with_metadata, auto_generate_portal_config
 )
-from data_processing import get_processed_data, data_processor
+from data_processing import (
+    get_processed_data, get_processed_batch, data_processor, TIMELINE_ITEMS_PAGE_SIZE, BATCH_MAX_REQUESTS
+)
+from cache_warmup import cache_warmer
+from data_jobs import job_manager, JobQueueFullError
+from data_cache import canonical_params
+from http_cache import (
+    ChangeClock, cached_response, compress_response, compressed_bodies, content_hash, levels_version, make_etag,
+    not_modified, set_validators
+)
+from request_timing import start_timer, current_timer, clear_timer, timed
 
 app = Flask(__name__)
 CORS(app)
@@ -20,6 +31,15 @@ app.config['STATIC_FOLDER'] = 'public'
 PORTALS = get_portals_list()
 PROJECTS = get_projects_dict()
 
+# Last-Modified times of the in-memory portal config, which has no file to take them from
+config_changes = ChangeClock()
+
+# Optionally precompute common data results in the background (SIGNPOST_WARM_CACHE=1), once per
+# process under any server (WSGI servers, flask run, python app.py); the reloader's watcher process
+# of python app.py never serves requests, so only its serving child warms
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    cache_warmer.start_if_enabled()
+
 @app.route('/')
 def index():
     """Serve the main VR gateway"""
@@ -89,12 +109,19 @@ def get_available_levels():
 @app.route('/api/projects')
 def get_projects():
     """Get all projects with enhanced metadata"""
+    # Validate from the project config and the level file stats before reading any level
+    projects = get_projects_dict()
+    projects_hash = content_hash(projects)
+    levels, levels_modified = levels_version()
+    etag = make_etag('projects', projects_hash, levels)
+    last_modified = max(filter(None, [config_changes.changed_at('projects', projects_hash), levels_modified]))
+    cached = not_modified(etag, last_modified) or cached_response(etag, last_modified)
+    if cached:
+        return cached
+    
     # Get discovered levels
     discovered_levels = discover_levels()
     
-    # Get existing projects
-    projects = get_projects_dict()
-    
     # Enhance projects with level information
     enhanced_projects = {}
     for project_id, project_data in projects.items():
@@ -108,11 +135,11 @@ def get_projects():
         
         enhanced_projects[project_id] = enhanced_project
     
-    return jsonify({
+    return set_validators(jsonify({
         'projects': enhanced_projects,
         'discovered_levels': discovered_levels,
         'total_projects': len(enhanced_projects)
-    })
+    }), etag, last_modified)
 
 @app.route('/api/projects/<project_id>')
 def get_project(project_id):
@@ -219,12 +246,18 @@ def delete_project(project_id):
 @app.route('/api/levels/discover')
 def discover_all_levels():
     """Discover all levels with detailed metadata"""
+    levels, last_modified = levels_version()
+    etag = make_etag('levels', levels)
+    cached = not_modified(etag, last_modified) or cached_response(etag, last_modified)
+    if cached:
+        return cached
+    
     discovered_levels = discover_levels()
-    return jsonify({
+    return set_validators(jsonify({
         'discovered_levels': discovered_levels,
         'total_categories': len(discovered_levels),
         'total_levels': sum(category_data['count'] for category_data in discovered_levels.values())
-    })
+    }), etag, last_modified)
 
 @app.route('/api/levels/<category>/<level_name>/metadata')
 def get_level_metadata_endpoint(category, level_name):
@@ -281,19 +314,129 @@ def get_data(source):
         if isinstance(params, str):
             params = json.loads(params) if params else {}
         
-        result = get_processed_data(source, format_type, params)
+        # Answer revalidations and repeats (from precompressed bodies) from the source file
+        # versions alone, before anything is fetched
+        validators = data_processor.data_validators(source, 'processed', format_type, canonical_params(params))
+        if validators:
+            cached = not_modified(*validators) or cached_response(*validators)
+            if cached:
+                return cached
+        
+        result = get_processed_data(source, format_type, params, stored=job_manager.stored_result)
         
         if 'error' in result:
             return jsonify(result), 400
         
-        return jsonify(result)
-    
+        # Binary formats carry their own packed body
+        if 'buffer' in result:
+            response = Response(result['buffer'], mimetype=result['content_type'])
+        else:
+            response = timed_jsonify(result)
+        return set_validators(response, *validators) if validators else response
+    
+    except TimeoutError as e:
+        return jsonify({'error': str(e), 'source': source}), 504
     except Exception as e:
         return jsonify({'error': f'Failed to process data: {str(e)}'}), 500
 
+@app.route('/api/data/batch', methods=['POST'])
+def get_data_batch():
+    """
+    Get several processed results in one round trip
+    
+    Body: {"requests": [{"source": ..., "format": ..., "params": {...}}, ...], "parallel": true}
+    Each distinct source and params pair is fetched once; results come back in request order.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get('requests'), list) or not body['requests']:
+        return jsonify({'error': 'Expected a JSON body with a non-empty requests list'}), 400
+    if len(body['requests']) > BATCH_MAX_REQUESTS:
+        return jsonify({'error': f'At most {BATCH_MAX_REQUESTS} requests per batch'}), 400
+    
+    try:
+        results = get_processed_batch(body['requests'], parallel=bool(body.get('parallel', True)))
+        return timed_jsonify({
+            'results': results,
+            'total_results': len(results),
+            'errors': sum(1 for result in results if 'error' in result)
+        })
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to process batch: {str(e)}'}), 500
+
+@app.route('/api/data/jobs', methods=['POST'])
+def submit_data_job():
+    """
+    Start processing data in the background and return a job id right away
+    
+    Body: {"source": ..., "format": ..., "params": {...}}; poll GET /api/data/jobs/<job_id>
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get('source'), str):
+        return jsonify({'error': 'Expected a JSON body with a source'}), 400
+    params = body.get('params') or {}
+    if not isinstance(params, dict):
+        return jsonify({'error': 'params must be an object', 'source': body['source']}), 400
+    
+    try:
+        job = job_manager.submit(body['source'], body.get('format', '3d_scatter'), params)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'source': body['source']}), 400
+    except JobQueueFullError as e:
+        return jsonify({'error': str(e), 'source': body['source']}), 503
+    
+    job['status_url'] = f"/api/data/jobs/{job['job_id']}"
+    return jsonify(job), 200 if job['state'] == 'done' else 202
+
+@app.route('/api/data/jobs/<job_id>')
+def get_data_job(job_id):
+    """Get a job's state and progress, with its result once it is done"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown or expired job: {job_id}'}), 404
+    return timed_jsonify(job)
+
 @app.route('/api/data/<source>/raw')
 def get_raw_data(source):
-    """Get raw data without processing"""
+    """Get raw data without processing (add ?stream=ndjson to stream one record per line)"""
+    params = request.args.get('params', '{}')
+    
+    try:
+        # Parse params if provided as JSON string
+        if isinstance(params, str):
+            params = json.loads(params) if params else {}
+        
+        stream = request.args.get('stream')
+        validators = data_processor.data_validators(source, 'raw', stream, canonical_params(params))
+        if validators:
+            cached = not_modified(*validators) or cached_response(*validators)
+            if cached:
+                return cached
+        
+        if stream == 'ndjson':
+            response = stream_raw_data(source, params)
+            if isinstance(response, tuple):
+                # Errors found before streaming starts are not cacheable
+                return response
+            if validators:
+                # A stream cut short by an error still ends in a 200, so it must not carry a
+                # strong ETag; Last-Modified is enough for clients to revalidate
+                return set_validators(response, None, validators[1])
+        else:
+            result = data_processor.fetch_data(source, params)
+            
+            if 'error' in result:
+                return jsonify(result), 400
+            
+            response = timed_jsonify(result)
+        return set_validators(response, *validators) if validators else response
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch data: {str(e)}'}), 500
+
+@app.route('/api/data/<source>/query')
+def query_data(source):
+    """Query data by location: ?bbox=min_lat,min_lng,max_lat,max_lng, ?near=lat,lng&radius=m or ?near=lat,lng&knn=k"""
     params = request.args.get('params', '{}')
     
     try:
@@ -301,83 +444,164 @@ def get_raw_data(source):
         if isinstance(params, str):
             params = json.loads(params) if params else {}
         
-        result = data_processor.fetch_data(source, params)
+        try:
+            bbox = parse_coordinates(request.args.get('bbox'), 4)
+            near = parse_coordinates(request.args.get('near'), 2)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'source': source}), 400
+        radius = request.args.get('radius', type=float)
+        knn = request.args.get('knn', type=int)
+        
+        result = data_processor.spatial_query(source, bbox=bbox, near=near, radius=radius, knn=knn, params=params)
         
         if 'error' in result:
             return jsonify(result), 400
         
-        return jsonify(result)
+        return timed_jsonify(result)
     
     except Exception as e:
-        return jsonify({'error': f'Failed to fetch data: {str(e)}'}), 500
+        return jsonify({'error': f'Failed to query data: {str(e)}'}), 500
+
+@app.route('/api/data/<source>/timeline/<period>/items')
+def get_timeline_items(source, period):
+    """Get a page of the items in one timeline bucket (?page=1&page_size=100)"""
+    params = request.args.get('params', '{}')
+    
+    try:
+        # Parse params if provided as JSON string
+        if isinstance(params, str):
+            params = json.loads(params) if params else {}
+        
+        page = request.args.get('page', 1, type=int)
+        page_size = request.args.get('page_size', TIMELINE_ITEMS_PAGE_SIZE, type=int)
+        result = data_processor.get_timeline_items(source, period, params, page, page_size)
+        
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        return timed_jsonify(result)
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to fetch timeline items: {str(e)}'}), 500
+
+@app.route('/api/data/<source>/tiles')
+def get_tile_info(source):
+    """Get the bounds and zoom range of a source's level-of-detail tiles"""
+    result = data_processor.get_tile_info(source)
+    if 'error' in result:
+        return jsonify(result), 400
+    return timed_jsonify(result)
+
+@app.route('/api/data/<source>/tiles/<int:z>/<int:x>/<int:y>')
+def get_tile(source, z, x, y):
+    """Get a level-of-detail tile of 3D scatter points, aggregated when the tile is dense"""
+    etag = data_processor.tile_etag(source, z, x, y)
+    if etag:
+        # Revalidations may carry the ETag of a compressed coding; repeats may be precompressed
+        cached = not_modified(etag) or cached_response(etag)
+        if cached:
+            cached.headers['Cache-Control'] = 'public, max-age=300'
+            return cached
+    
+    result = data_processor.get_tile(source, z, x, y)
+    if 'error' in result:
+        return jsonify(result), 400
+    
+    response = timed_jsonify(result)
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
+
+def timed_jsonify(payload):
+    """jsonify a payload, timing the serialization as a request stage"""
+    with timed('serialize', 'jsonify'):
+        return jsonify(payload)
+
+@app.before_request
+def start_request_timer():
+    """Time the stages of data requests"""
+    if request.path.startswith('/api/data/'):
+        start_timer()
+
+@app.after_request
+def report_request_timing(response):
+    """Report data request stage timings as a Server-Timing header and a structured log line"""
+    timer = current_timer()
+    if timer is None:
+        return response
+    
+    response.headers['Server-Timing'] = timer.server_timing()
+    # Let cross-origin pages (allowed by CORS) read the timings too
+    response.headers['Timing-Allow-Origin'] = '*'
+    timer.log(
+        method=request.method,
+        path=request.path,
+        query=request.query_string.decode('utf-8', 'replace'),
+        status=response.status_code,
+        bytes=response.content_length
+    )
+    clear_timer()
+    return response
+
+@app.after_request
+def compress_api_response(response):
+    """Compress large API responses (registered last so it runs before the timing report)"""
+    if request.path.startswith('/api/'):
+        return compress_response(response)
+    return response
+
+def parse_coordinates(value, count):
+    """Parse a comma-separated list of numbers such as 'lat,lng'"""
+    if value is None:
+        return None
+    numbers = [float(part) for part in value.split(',')]
+    if len(numbers) != count:
+        raise ValueError(f"Expected {count} comma-separated numbers, got '{value}'")
+    return numbers
+
+def stream_raw_data(source, params):
+    """Stream raw records as newline-delimited JSON while they are still being converted"""
+    records = data_processor.iter_records(source, params)
+    
+    # Pull the first record up front so bad sources or params still get a proper error response
+    try:
+        first = list(itertools.islice(records, 1))
+    except Exception as e:
+        return jsonify({'error': str(e), 'source': source}), 400
+    
+    def generate():
+        try:
+            for record in itertools.chain(first, records):
+                yield json.dumps(record) + '\n'
+        except Exception as e:
+            # Headers are already sent, so the error can only be logged
+            app.logger.error(f"Error streaming data from {source}: {str(e)}")
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/api/data/sources')
 def get_data_sources():
-    """Get list of available data sources"""
-    sources = {
-        'crime_data': {
-            'name': 'Kansas City Crime Data',
-            'description': 'Crime incidents and statistics for Kansas City metro area',
-            'formats': ['3d_scatter', 'heatmap', 'timeline'],
-            'params': {
-                'n_points': 'Number of data points to generate (default: 100)'
-            }
-        },
-        'funding_data': {
-            'name': 'Federal Funding Flow',
-            'description': 'Federal funding data across agencies and states',
-            'formats': ['3d_scatter', 'heatmap', 'timeline', 'network'],
-            'params': {
-                'n_agencies': 'Number of agencies to include (default: 20)'
-            }
-        },
-        'education_data': {
-            'name': 'Education Statistics',
-            'description': 'School data including enrollment, performance, and funding',
-            'formats': ['3d_scatter', 'heatmap'],
-            'params': {
-                'n_schools': 'Number of schools to include (default: 50)'
-            }
-        },
-        'democracy_data': {
-            'name': 'Democracy Metrics',
-            'description': 'Voting data, gerrymandering scores, and demographic information',
-            'formats': ['3d_scatter', 'heatmap', 'network'],
-            'params': {
-                'n_districts': 'Number of districts to include (default: 100)'
-            }
-        },
-        'kansas_city_crashes': {
-            'name': 'Kansas City Crash Data',
-            'description': 'Traffic accident records from Kansas City',
-            'formats': ['3d_scatter', 'heatmap', 'timeline'],
-            'params': {
-                'limit': 'Number of records to include (default: all)'
-            }
-        },
-        'kansas_city_intersections': {
-            'name': 'Kansas City Intersection Data',
-            'description': 'Geographic intersection information',
-            'formats': ['3d_scatter', 'heatmap'],
-            'params': {
-                'limit': 'Number of records to include (default: all)'
-            }
-        },
-        'kansas_city_gps': {
-            'name': 'Kansas City GPS Data',
-            'description': 'Location coordinates and mapping data',
-            'formats': ['3d_scatter', 'heatmap'],
-            'params': {
-                'limit': 'Number of records to include (default: all)'
-            }
-        }
-    }
+    """Get list of available data sources from the data source registry"""
+    sources = data_processor.registry.describe()
     
     return jsonify({
         'sources': sources,
         'total_sources': len(sources)
     })
 
+@app.route('/api/data/cache/stats')
+def get_data_cache_stats():
+    """Get hit/miss/eviction counters for the processed data cache"""
+    return jsonify({
+        'result_cache': data_processor.result_cache.stats(),
+        'tile_cache': data_processor.tile_cache.stats(),
+        'timeline_bucket_cache': data_processor.timeline_bucket_cache.stats(),
+        'single_flight': data_processor.single_flight.stats(),
+        'jobs': job_manager.stats(),
+        'compressed_bodies': compressed_bodies.stats()
+    })
+
 @app.route('/api/data/formats')
 def get_data_formats():
     """Get list of available data formats"""
@@ -387,16 +611,31 @@ def get_data_formats():
             'description': 'Three-dimensional scatter plot visualization',
             'best_for': ['Geographic data', 'Multi-dimensional relationships', 'Point clouds']
         },
+        '3d_scatter_bin': {
+            'name': 'Binary Point Cloud',
+            'description': '3D scatter points packed into typed arrays (application/octet-stream)',
+            'best_for': ['Large point clouds', 'Fast scene loading', 'Direct GPU upload']
+        },
         'heatmap': {
             'name': 'Heatmap',
             'description': 'Color-coded intensity map',
             'best_for': ['Density visualization', 'Category comparisons', 'Statistical patterns']
         },
+        'geo_heatmap': {
+            'name': 'Geographic Heatmap',
+            'description': 'Latitude/longitude binned into a grid with count, sum, mean or max per cell',
+            'best_for': ['Crash density', 'Geographic hotspots', 'Large point datasets']
+        },
         'timeline': {
             'name': 'Timeline',
             'description': 'Time-based data visualization',
             'best_for': ['Temporal data', 'Historical trends', 'Event sequences']
         },
+        'timeline_summary': {
+            'name': 'Timeline Summary',
+            'description': 'Per-period count, sum, min, max and percentiles; items are paged separately',
+            'best_for': ['Large temporal datasets', 'Trend overviews', 'Lazy drill-down']
+        },
         'network': {
             'name': 'Network Graph',
             'description': 'Connected node and edge visualization',
@@ -411,19 +650,28 @@ def get_data_formats():
 
 @app.route('/api/health')
 def health():
-    """Health check endpoint"""
+    """Health check endpoint (ready turns true once any cache warm-up has finished)"""
+    warmup = cache_warmer.status()
     return jsonify({
         'status': 'healthy',
+        'ready': warmup['ready'],
         'message': 'Signpost Observatory VR Gateway is running',
         'timestamp': datetime.now().isoformat(),
         'framework': 'Flask',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'warmup': warmup
     })
 
 @app.route('/api/portals')
 def get_portals():
     """Get all available portals"""
-    return jsonify(PORTALS)
+    portals_hash = content_hash(PORTALS)
+    etag = make_etag('portals', portals_hash)
+    last_modified = config_changes.changed_at('portals', portals_hash)
+    cached = not_modified(etag, last_modified) or cached_response(etag, last_modified)
+    if cached:
+        return cached
+    return set_validators(jsonify(PORTALS), etag, last_modified)
 
 @app.route('/api/portals/available')
 def get_available_portals():
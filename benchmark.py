@@ -0,0 +1,188 @@
+"""
+Benchmark Suite for Signpost Observatory
+Times the DataProcessor pipeline on synthetic CSVs shaped like all_intersections.csv
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_cache import ColumnarCache
+from data_registry import DataSource
+
+try:
+    import resource
+except ImportError:
+    # Peak RSS comes from getrusage, which Windows does not provide
+    resource = None
+
+# Row counts benchmarked by default
+BENCH_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+# Formats benchmarked by default (those that apply to intersection-shaped data)
+BENCH_FORMATS = ['3d_scatter', '3d_scatter_bin', 'heatmap', 'geo_heatmap']
+
+BENCH_DIR = os.path.join("data_cache", "bench")
+BENCH_SEED = 42
+
+# Street names combined into synthetic "A & B" intersection names
+STREETS = ['GREGORY BLVD', 'E 55TH ST', 'E 59TH ST', 'N FLINTLOCK RD', 'TROOST AVE', 'PROSPECT AVE',
+           'MAIN ST', 'BROADWAY BLVD', 'INDEPENDENCE AVE', 'TRUMAN RD', 'E 31ST ST', 'W 39TH ST',
+           'WARD PKWY', 'STATE LINE RD', 'BLUE RIDGE BLVD', 'NW BARRY RD', 'N OAK TRFY', 'US 71',
+           'I-435', 'I-70', 'MO 152', 'US 24', 'NE VIVION RD', 'E BANNISTER RD']
+
+
+def generate_intersections_csv(rows: int, path: str, seed: int = BENCH_SEED):
+    """Write a synthetic CSV with the columns of all_intersections.csv"""
+    rng = np.random.default_rng(seed)
+    pairs = [f"CST {a} & {b}" for a in STREETS for b in STREETS if a != b]
+    df = pd.DataFrame({
+        'Intersection': pd.Categorical.from_codes(rng.integers(0, len(pairs), rows), pairs),
+        'CrashCount': rng.geometric(0.05, rows),
+        'Latitude': np.round(rng.normal(39.05, 0.15, rows), 7),
+        'Longitude': np.round(rng.normal(-94.55, 0.15, rows), 7)
+    })
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Get the peak resident memory of this process so far, or None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def bench_size(rows: int, formats: List[str], bench_dir: str = BENCH_DIR) -> Dict[str, Any]:
+    """
+    Benchmark one dataset size; meant to run in its own process so peak memory is per size
+
+    Returns:
+        Timings in seconds and output sizes per stage, with the peak RSS after each stage
+    """
+    # Imported here so each worker process builds its own processor
+    from data_processing import DataProcessor
+
+    csv_path = os.path.join(bench_dir, f"intersections_{rows}.csv")
+    start = time.perf_counter()
+    generated = not os.path.exists(csv_path)
+    if generated:
+        generate_intersections_csv(rows, csv_path)
+    result = {
+        'rows': rows,
+        'file_bytes': os.path.getsize(csv_path),
+        'generate_seconds': time.perf_counter() - start if generated else None,
+        'stages': {}
+    }
+
+    processor = DataProcessor()
+    cache = ColumnarCache(os.path.join(bench_dir, "cache"))
+    cache.invalidate(csv_path)
+    processor.columnar_cache = cache
+    # Every size shares the bench directory, so the source is pinned to this size's file
+    source = DataSource('bench_intersections', 'csv', 'Benchmark Intersections',
+                        project='bench', data_type='intersections', raw_dir=bench_dir,
+                        config={'file_pattern': os.path.basename(csv_path)})
+    processor.registry.register(source)
+
+    def record(stage: str, seconds: float, **extra):
+        result['stages'][stage] = dict(seconds=seconds, peak_rss_mb=peak_rss_mb(), **extra)
+
+    # Cold fetch parses the CSV and writes the columnar cache; warm fetch reads the cache
+    for stage in ('fetch_cold', 'fetch_warm'):
+        start = time.perf_counter()
+        raw_data = processor._fetch_csv_data(source)
+        record(stage, time.perf_counter() - start, records=len(raw_data.get('data', [])))
+        if 'error' in raw_data:
+            result['error'] = raw_data['error']
+            return result
+
+    for format_type in formats:
+        start = time.perf_counter()
+        processed = processor.process_data(raw_data, format_type)
+        seconds = time.perf_counter() - start
+        if 'error' in processed:
+            record(f"process_{format_type}", seconds, error=processed['error'])
+            continue
+        record(f"process_{format_type}", seconds)
+
+        # Serialize like jsonify does outside debug mode; binary formats are already bytes
+        start = time.perf_counter()
+        if 'buffer' in processed:
+            body_bytes = len(processed['buffer'])
+        else:
+            body_bytes = len(json.dumps(processed, sort_keys=True, separators=(',', ':')))
+        record(f"serialize_{format_type}", time.perf_counter() - start, bytes=body_bytes)
+        del processed
+
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def git_commit() -> Optional[str]:
+    """Get the current commit so runs can be compared across commits"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes: Optional[List[int]] = None, formats: Optional[List[str]] = None,
+                   output: Optional[str] = None, on_result=None) -> Dict[str, Any]:
+    """
+    Run the benchmark suite and write the results as JSON
+
+    Args:
+        sizes: Row counts to benchmark (default BENCH_SIZES)
+        formats: process_data formats to benchmark (default BENCH_FORMATS)
+        output: Result file path (default data_cache/bench/bench-<timestamp>.json)
+        on_result: Called with each size's result as it completes
+
+    Returns:
+        The full benchmark report, including the path it was written to
+    """
+    sizes = sizes or BENCH_SIZES
+    formats = formats or BENCH_FORMATS
+    if not os.path.exists(BENCH_DIR):
+        os.makedirs(BENCH_DIR)
+
+    report = {
+        'benchmark': 'data_processor',
+        'started_at': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'formats': formats,
+        'results': []
+    }
+
+    for rows in sizes:
+        # A fresh process per size keeps the peak memory of one size from hiding the next
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(bench_size, rows, formats).result()
+        report['results'].append(result)
+        if on_result:
+            on_result(result)
+
+    report['finished_at'] = datetime.now().isoformat()
+    output = output or os.path.join(BENCH_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    report['output'] = output
+    return report
@@ -0,0 +1,191 @@
+"""
+Cache Warm-up for Signpost Observatory
+Precomputes commonly requested (source, format) results so the first visitor does not pay for them
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from data_jobs import job_manager
+from data_processing import data_processor, get_processed_data
+
+logger = logging.getLogger(__name__)
+
+# Pseudo-format that builds a source's tile quadtree and caches its root tile
+TILES_TASK = 'tiles'
+
+# Seconds results stored by a persisted warm-up (manage.py warm) stay on disk for the server
+WARM_RESULT_TTL_SECONDS = 24 * 3600
+
+# Environment variable that turns on the background warm-up when the app starts
+WARM_CACHE_ENV = 'SIGNPOST_WARM_CACHE'
+
+
+class CacheWarmer:
+    """
+    Runs every warm-up task once and tracks progress for /api/health.
+
+    Each task requests a (source, format) result with default params, which parses the
+    source into the on-disk columnar cache and stores the result in the result cache.
+    Results already stored on disk by the job manager are loaded instead of recomputed; a
+    persisted warm-up also stores its JSON results there, so a warm-up run from another
+    process (manage.py warm) is picked up by the server.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.state = 'idle'
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.current = None
+        self.started_at = None
+        self.finished_at = None
+        self.errors: List[Dict[str, str]] = []
+        self._startup_requested = False
+
+    def tasks(self, sources: Optional[List[str]] = None, formats: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+        """
+        Get the (source, format) combinations to warm
+
+        Args:
+            sources: Source ids to warm (default every available source)
+            formats: Formats to warm (default each source's advertised formats)
+
+        Returns:
+            List of (source, format) tuples; CSV sources with coordinates also get a tiles task
+        """
+        tasks = []
+        for source_id, info in data_processor.registry.describe().items():
+            if sources and source_id not in sources:
+                continue
+            if not info.get('available', True):
+                continue
+            for format_type in info['formats']:
+                if not formats or format_type in formats:
+                    tasks.append((source_id, format_type))
+            if 'geo_heatmap' in info['formats'] and (not formats or TILES_TASK in formats):
+                tasks.append((source_id, TILES_TASK))
+        return tasks
+
+    def run(self, tasks: Optional[List[Tuple[str, str]]] = None,
+            on_progress: Optional[Callable[[str, str, Optional[str], float], None]] = None,
+            persist: bool = False) -> Dict[str, Any]:
+        """
+        Run the warm-up tasks in the calling thread
+
+        Args:
+            tasks: (source, format) tuples to warm (default every task from tasks())
+            on_progress: Called after each task with (source, format, error or None, seconds)
+            persist: Also store the results on disk for WARM_RESULT_TTL_SECONDS (binary formats
+                and tiles are not stored; their warm-up only fills the columnar cache)
+
+        Returns:
+            The final warm-up status
+        """
+        tasks = self.tasks() if tasks is None else tasks
+        with self._lock:
+            self.state = 'running'
+            self.total = len(tasks)
+            self.completed = 0
+            self.failed = 0
+            self.errors = []
+            self.started_at = datetime.now()
+            self.finished_at = None
+
+        for source, format_type in tasks:
+            with self._lock:
+                self.current = f"{source}/{format_type}"
+            start = time.perf_counter()
+            error = self._warm(source, format_type, persist)
+            seconds = time.perf_counter() - start
+
+            with self._lock:
+                self.completed += 1
+                if error:
+                    self.failed += 1
+                    self.errors.append({'source': source, 'format': format_type, 'error': error})
+            if error:
+                logger.warning(f"Warm-up of {source}/{format_type} failed: {error}")
+            if on_progress:
+                on_progress(source, format_type, error, seconds)
+
+        with self._lock:
+            self.state = 'done'
+            self.current = None
+            self.finished_at = datetime.now()
+        logger.info(f"Cache warm-up finished: {self.completed - self.failed}/{self.total} tasks succeeded")
+        return self.status()
+
+    def start(self) -> bool:
+        """
+        Run the warm-up in a background thread so the server can accept traffic meanwhile
+
+        Returns:
+            False if a warm-up is already running
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            # Mark the warm-up as running right away so /api/health never reports a false ready
+            self.state = 'running'
+            self._thread = threading.Thread(target=self.run, name='cache-warmup', daemon=True)
+        self._thread.start()
+        return True
+
+    def start_if_enabled(self) -> bool:
+        """
+        Start the background warm-up once per process when SIGNPOST_WARM_CACHE=1
+
+        Safe to call from app startup under any server; later calls do nothing.
+
+        Returns:
+            True if this call started the warm-up
+        """
+        with self._lock:
+            if self._startup_requested or os.environ.get(WARM_CACHE_ENV) != '1':
+                return False
+            self._startup_requested = True
+        logger.info("Starting cache warm-up in the background")
+        return self.start()
+
+    def status(self) -> Dict[str, Any]:
+        """Get the warm-up progress; ready is False only while a warm-up is running"""
+        with self._lock:
+            elapsed = None
+            if self.started_at:
+                elapsed = ((self.finished_at or datetime.now()) - self.started_at).total_seconds()
+            return {
+                'state': self.state,
+                'ready': self.state != 'running',
+                'total': self.total,
+                'completed': self.completed,
+                'failed': self.failed,
+                'progress': self.completed / self.total if self.total else (0.0 if self.state == 'running' else 1.0),
+                'current': self.current,
+                'started_at': self.started_at.isoformat() if self.started_at else None,
+                'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+                'elapsed_seconds': elapsed,
+                'errors': list(self.errors)
+            }
+
+    def _warm(self, source: str, format_type: str, persist: bool = False) -> Optional[str]:
+        """Warm one task, returning its error message if it failed"""
+        try:
+            if format_type == TILES_TASK:
+                return data_processor.get_tile(source, 0, 0, 0).get('error')
+            result = get_processed_data(source, format_type, {}, stored=job_manager.stored_result)
+            if persist and 'error' not in result:
+                job_manager.store_result(source, format_type, {}, result, WARM_RESULT_TTL_SECONDS)
+            return result.get('error')
+        except Exception as e:
+            return str(e)
+
+
+# Global cache warmer instance
+cache_warmer = CacheWarmer()
@@ -0,0 +1,534 @@
+"""
+Data Cache for Signpost Observatory
+Persistent columnar cache for parsed CSV sources and an in-process cache for processed results
+"""
+
+import io
+import os
+import glob
+import json
+import time
+import shutil
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from data_schema import FrameSchema, memory_bytes, unify_categories
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    # Parquet needs pyarrow; fall back to pandas' pickle format which is still typed and binary
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed at the start of a file and just before its previously parsed end to confirm
+# that a grown file was appended to rather than rewritten
+APPEND_FINGERPRINT_BYTES = 65536
+
+# numpy dtype kinds stored as memory-mapped .npy files (bool, integers, floats, dates, durations)
+MAPPED_DTYPE_KINDS = 'biufmM'
+
+
+def file_version(path: str) -> Tuple[int, int]:
+    """Get the (mtime_ns, size) version of a file, used to detect changes"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def code_version(directory: str) -> str:
+    """Hash the Python modules in a directory, so anything derived from their output can tell deploys apart"""
+    digest = hashlib.sha1()
+    for path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class ColumnarCache:
+    """
+    Parses each raw CSV once and keeps a typed binary copy in the cache directory.
+
+    Entries are keyed on the absolute path plus the file's mtime and size and the schema
+    they were compacted with, so a changed raw file produces a new key and the stale entry
+    is removed. Each entry has a JSON manifest recording how many bytes and rows it covers;
+    when a file has only had rows appended, just the new bytes are parsed and merged into
+    the previous entry. Sources with a schema are stored compacted, and the manifest records
+    the schema and the memory the parsed columns took before and after compaction.
+
+    Each entry is a directory holding the table, its memory-mapped columns, their layout
+    and the manifest. It is written under a unique temporary name and published with a
+    single rename, so readers in any thread or process see a whole entry or none; older
+    versions are only removed once the new one is in place. Writers of the same file are
+    serialized within a process, so concurrent cold loads parse it once.
+
+    Numeric columns are stored as one .npy file each and memory-mapped read-only, so
+    slices of them are views and every worker process shares them through the OS page
+    cache. Loaded frames are kept per entry and shared between callers, so they must
+    not be modified in place.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = os.path.join(cache_dir, "columnar")
+        self.extension = ".parquet" if PARQUET_AVAILABLE else ".pkl"
+        self._frames: Dict[str, Tuple[pd.DataFrame, Dict[str, Any]]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def _path_prefix(self, csv_path: str) -> str:
+        """Get the cache entry prefix shared by every version of a CSV file"""
+        path_hash = hashlib.sha1(os.path.abspath(csv_path).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"csv-{path_hash}-")
+
+    def entry_path(self, csv_path: str, version: Optional[Tuple[int, int]] = None,
+                   schema: Optional[FrameSchema] = None) -> str:
+        """Get the cache entry directory for a version of a CSV file (default the current one)"""
+        mtime_ns, size = version or file_version(csv_path)
+        schema_key = schema.key if schema else None
+        version_hash = hashlib.sha1(f"{mtime_ns}:{size}:{schema_key}".encode("utf-8")).hexdigest()[:16]
+        return self._path_prefix(csv_path) + version_hash
+
+    def manifest_path(self, entry: str) -> str:
+        """Get the manifest path of a cache entry"""
+        return os.path.join(entry, "manifest.json")
+
+    def table_path(self, entry: str) -> str:
+        """Get the path of the table holding a cache entry's columns that are not memory-mapped"""
+        return os.path.join(entry, "table" + self.extension)
+
+    def manifest(self, csv_path: str, schema: Optional[FrameSchema] = None) -> Optional[Dict[str, Any]]:
+        """Get the manifest of the current version of a CSV file, or None if it is not cached"""
+        return self._read_manifest(self.entry_path(csv_path, schema=schema))
+
+    def load(self, csv_path: str, parser: Callable[[Union[str, io.BytesIO]], pd.DataFrame],
+             schema: Optional[FrameSchema] = None) -> pd.DataFrame:
+        """
+        Load a parsed CSV from the cache, parsing and storing it on a miss
+
+        Args:
+            csv_path: Path to the raw CSV file
+            parser: Function that parses a CSV path or buffer into a DataFrame
+            schema: Schema that compacts the parsed columns (default keep the parsed dtypes)
+
+        Returns:
+            The parsed DataFrame
+        """
+        return self.update(csv_path, parser, schema)[0]
+
+    def update(self, csv_path: str, parser: Callable[[Union[str, io.BytesIO]], pd.DataFrame],
+               schema: Optional[FrameSchema] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Bring the cache entry for a CSV file up to date
+
+        Args:
+            csv_path: Path to the raw CSV file
+            parser: Function that parses a CSV path or buffer into a DataFrame
+            schema: Schema that compacts the parsed columns (default keep the parsed dtypes)
+
+        Returns:
+            Tuple of (DataFrame, manifest); the manifest's status is 'cached' when the entry
+            was current, 'appended' when only new rows were parsed, or 'parsed' otherwise
+        """
+        cached = self._cached(self.entry_path(csv_path, schema=schema))
+        if cached is not None:
+            return cached
+
+        with self._path_lock(csv_path):
+            # Another thread may have written the entry while this one waited
+            cached = self._cached(self.entry_path(csv_path, schema=schema))
+            if cached is not None:
+                return cached
+
+            fingerprint = self._fingerprint(csv_path)
+            entry = self.entry_path(csv_path, tuple(fingerprint['version']), schema)
+            appended = self._load_appended(csv_path, parser, schema, fingerprint)
+            if appended is not None:
+                df, manifest = appended
+            else:
+                df = parser(csv_path)
+                manifest = {'status': 'parsed', 'rows': len(df), 'rows_added': len(df)}
+                if schema:
+                    parsed_bytes = memory_bytes(df)
+                    df = schema.compact(df)
+                    manifest['memory'] = {'parsed_bytes': parsed_bytes, 'compact_bytes': memory_bytes(df)}
+            manifest.update(fingerprint)
+            manifest['schema'] = schema.key if schema else None
+
+            if file_version(csv_path) != tuple(fingerprint['version']):
+                # The file changed while it was parsed, so the rows may not match the manifest
+                logger.info(f"{csv_path} changed while loading, not caching it")
+                return df, manifest
+            if self._write(csv_path, entry, df, manifest):
+                # Serve later loads from the memory-mapped copy rather than the parsed frame
+                try:
+                    df = self._read(entry)
+                    self._frames[entry] = (df, self._read_manifest(entry) or {})
+                except Exception as e:
+                    logger.warning(f"Could not map cache entry {entry}: {str(e)}")
+            return df, manifest
+
+    def invalidate(self, csv_path: str, keep: Optional[str] = None):
+        """Remove every cached version of a CSV file, except the entry keep"""
+        prefix = self._path_prefix(csv_path)
+        for entry in [entry for entry in self._frames if entry.startswith(prefix) and entry != keep]:
+            self._frames.pop(entry, None)
+        for stale in glob.glob(prefix + "*"):
+            if stale == keep or stale.endswith(".tmp"):
+                # Entries still being written belong to their writer, which publishes or removes them
+                continue
+            try:
+                if os.path.isdir(stale):
+                    shutil.rmtree(stale)
+                else:
+                    os.remove(stale)
+            except OSError as e:
+                # Windows refuses to delete files that are still mapped; they go on the next write
+                logger.warning(f"Could not remove stale cache file {stale}: {str(e)}")
+
+    def _path_lock(self, csv_path: str) -> threading.Lock:
+        """Get the lock serializing the writers of one CSV file in this process"""
+        key = os.path.abspath(csv_path)
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _cached(self, entry: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Get a current entry from memory or disk, or None if it has not been written"""
+        loaded = self._frames.get(entry)
+        if loaded is None and os.path.isdir(entry):
+            try:
+                loaded = (self._read(entry), self._read_manifest(entry))
+                if loaded[1] is None:
+                    raise ValueError("missing manifest")
+            except Exception as e:
+                logger.warning(f"Discarding unreadable cache entry {entry}: {str(e)}")
+                shutil.rmtree(entry, ignore_errors=True)
+                return None
+            self._frames[entry] = loaded
+        if loaded is None:
+            return None
+        return loaded[0], dict(loaded[1], status='cached')
+
+    def _load_appended(self, csv_path: str, parser: Callable[[Union[str, io.BytesIO]], pd.DataFrame],
+                       schema: Optional[FrameSchema],
+                       fingerprint: Dict[str, Any]) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Merge the rows appended since the previous cache entry, or None if a full parse is needed"""
+        previous = None
+        for manifest_path in glob.glob(os.path.join(self._path_prefix(csv_path) + "*", "manifest.json")):
+            if os.path.dirname(manifest_path).endswith(".tmp"):
+                continue
+            manifest = self._read_manifest(os.path.dirname(manifest_path))
+            if manifest and 'bytes' in manifest:
+                previous = (os.path.dirname(manifest_path), manifest)
+        if previous is None:
+            return None
+
+        entry, manifest = previous
+        parsed_bytes = manifest['bytes']
+        if not manifest.get('complete') or not os.path.exists(entry) or fingerprint['bytes'] <= parsed_bytes:
+            return None
+        if manifest.get('schema') != (schema.key if schema else None):
+            return None
+        current = self._fingerprint(csv_path, parsed_bytes)
+        if current['head_hash'] != manifest['head_hash'] or current['tail_hash'] != manifest['tail_hash']:
+            # The already-parsed part changed, so this is a rewrite rather than an append
+            return None
+
+        try:
+            df = self._read(entry)
+            with open(csv_path, 'rb') as f:
+                header = f.readline()
+                f.seek(parsed_bytes)
+                delta = parser(io.BytesIO(header + f.read(fingerprint['bytes'] - parsed_bytes)))
+        except Exception as e:
+            logger.warning(f"Could not parse appended rows of {csv_path}, reparsing: {str(e)}")
+            return None
+        if list(delta.columns) != list(df.columns):
+            return None
+        delta_bytes = memory_bytes(delta) if schema else 0
+        if schema:
+            delta = schema.compact(delta)
+        df, delta = unify_categories([df, delta])
+
+        # Keep the cached dtypes where the new rows allow it so the result matches a full parse;
+        # numeric columns are left to concat, which widens rather than truncates compacted dtypes
+        for col in delta.columns:
+            old, new = df[col].dtype, delta[col].dtype
+            if new != old and not (pd.api.types.is_numeric_dtype(old) and pd.api.types.is_numeric_dtype(new)):
+                try:
+                    delta[col] = delta[col].astype(old)
+                except (TypeError, ValueError):
+                    pass
+        merged = pd.concat([df, delta], ignore_index=True)
+        logger.info(f"Merged {len(delta)} appended rows of {csv_path} into the cache")
+        result = {
+            'status': 'appended',
+            'rows': len(merged),
+            'rows_added': len(delta),
+            'appended_to': manifest['version'],
+            'previous_rows': len(df)
+        }
+        if schema and 'memory' in manifest:
+            result['memory'] = {'parsed_bytes': manifest['memory']['parsed_bytes'] + delta_bytes,
+                                'compact_bytes': memory_bytes(merged)}
+        return merged, result
+
+    def _fingerprint(self, csv_path: str, length: Optional[int] = None) -> Dict[str, Any]:
+        """Describe the first length bytes of a file (default all of it) for append detection"""
+        version = file_version(csv_path)
+        length = version[1] if length is None else length
+        with open(csv_path, 'rb') as f:
+            head = f.read(min(length, APPEND_FINGERPRINT_BYTES))
+            tail_start = max(length - APPEND_FINGERPRINT_BYTES, 0)
+            f.seek(tail_start)
+            tail = f.read(length - tail_start)
+        return {
+            'version': list(version),
+            'bytes': length,
+            'complete': tail.endswith(b"\n"),
+            'head_hash': hashlib.sha1(head).hexdigest(),
+            'tail_hash': hashlib.sha1(tail).hexdigest()
+        }
+
+    def _read_manifest(self, entry: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.manifest_path(entry), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _read(self, entry: str) -> pd.DataFrame:
+        table = self.table_path(entry)
+        df = pd.read_parquet(table) if PARQUET_AVAILABLE else pd.read_pickle(table)
+
+        # Every entry is published with its layout, so one without it is corrupt
+        with open(os.path.join(entry, "layout.json"), 'r') as f:
+            layout = json.load(f)
+
+        # Reassemble the columns in their original order without copying the mapped arrays
+        columns = {}
+        for name in layout['columns']:
+            if name in layout['mapped']:
+                path = os.path.join(entry, layout['mapped'][name])
+                columns[name] = np.load(path, mmap_mode='r' if layout['rows'] else None)
+            else:
+                columns[name] = df[name]
+        return pd.DataFrame(columns, copy=False)
+
+    def _write(self, csv_path: str, entry: str, df: pd.DataFrame, manifest: Dict[str, Any]) -> bool:
+        tmp_dir = f"{entry}.{uuid.uuid4().hex}.tmp"
+        try:
+            # Numeric columns go to .npy files; the table then holds the rest
+            os.makedirs(tmp_dir)
+            mapped = {}
+            for i, (name, col) in enumerate(df.items()):
+                if isinstance(col.dtype, np.dtype) and col.dtype.kind in MAPPED_DTYPE_KINDS:
+                    mapped[name] = f"{i}.npy"
+                    np.save(os.path.join(tmp_dir, mapped[name]), col.to_numpy())
+            rest = df.drop(columns=list(mapped))
+            if PARQUET_AVAILABLE:
+                rest.to_parquet(self.table_path(tmp_dir), index=False)
+            else:
+                rest.to_pickle(self.table_path(tmp_dir))
+            with open(os.path.join(tmp_dir, "layout.json"), 'w') as f:
+                json.dump({'columns': list(df.columns), 'mapped': mapped, 'rows': len(df)}, f)
+            with open(self.manifest_path(tmp_dir), 'w') as f:
+                json.dump({k: v for k, v in manifest.items() if k != 'status'}, f)
+
+            # Publish the whole entry at once; readers never see a partial one
+            try:
+                os.rename(tmp_dir, entry)
+            except OSError:
+                if not os.path.isdir(entry):
+                    raise
+                # Another process published the same version first; its entry is as good as this one
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            logger.info(f"Cached {csv_path} as {entry} ({len(mapped)} memory-mapped columns)")
+        except Exception as e:
+            # A cache write failure should never fail the request itself
+            logger.warning(f"Could not write cache entry for {csv_path}: {str(e)}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+        # Older versions (and entries of other schemas) go only once the new entry is in place
+        self.invalidate(csv_path, keep=entry)
+        return True
+
+
+def canonical_params(params: Optional[Dict[str, Any]]) -> str:
+    """Serialize request params so that equivalent params produce the same cache key"""
+    return json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ResultCache:
+    """
+    Bounded LRU cache for processed results with TTL expiry.
+
+    Each entry remembers the source version it was computed from; a lookup with a
+    different version invalidates the entry instead of returning stale data.
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl_seconds: float = 600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: Any) -> Tuple[bool, Any]:
+        """
+        Look up a cached result
+
+        Args:
+            key: Cache key
+            version: Current version of the data the result was computed from
+
+        Returns:
+            Tuple of (found, value)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            expires_at, entry_version, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            if entry_version != version:
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key: Hashable, version: Any, value: Any):
+        """Store a result, evicting the least recently used entries when full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove every cached result"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one computation.
+
+    The first caller for a key runs the computation; callers arriving while it is in flight
+    wait for it and share its result, or its exception. Waiters give up after a timeout. Once
+    the computation finishes the key is released, so later calls compute afresh (or hit a cache).
+    """
+
+    def __init__(self, timeout_seconds: float = 120):
+        self.timeout_seconds = timeout_seconds
+        self._calls: Dict[Hashable, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.computations = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def do(self, key: Hashable, compute: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Run compute once for every concurrent caller with the same key
+
+        Args:
+            key: Identifies identical requests
+            compute: Produces the result; only the first concurrent caller runs it
+            timeout: Seconds a waiting caller waits (default timeout_seconds)
+
+        Returns:
+            Tuple of (result, shared) where shared is True when another caller computed it
+
+        Raises:
+            TimeoutError: When the in-flight computation did not finish in time
+            Exception: Whatever the computation raised, re-raised in every caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {'done': threading.Event(), 'result': None, 'error': None}
+                self._calls[key] = call
+                self.computations += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call['result'] = compute()
+            except BaseException as e:
+                call['error'] = e
+                with self._lock:
+                    self.errors += 1
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call['done'].set()
+            return call['result'], False
+
+        timeout = self.timeout_seconds if timeout is None else timeout
+        if not call['done'].wait(timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"Timed out after {timeout:g}s waiting for an identical request in progress")
+        if call['error'] is not None:
+            raise call['error']
+        return call['result'], True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters of computations run and callers that shared one"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'timeout_seconds': self.timeout_seconds,
+                'computations': self.computations,
+                'coalesced': self.coalesced,
+                'timeouts': self.timeouts,
+                'errors': self.errors
+            }
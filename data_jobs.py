@@ -0,0 +1,333 @@
+"""
+Data Jobs for Signpost Observatory
+Runs expensive data requests in the background and keeps their results on disk for reuse
+"""
+
+import os
+import glob
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from data_cache import canonical_params
+from data_processing import data_processor, BINARY_FORMATS, CODE_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Jobs computed at once; further jobs wait in the queue
+JOB_MAX_WORKERS = 2
+
+# Jobs queued or running at once before new submissions are refused
+JOB_MAX_PENDING = 32
+
+# Seconds a finished result is kept on disk (and its job remembered)
+JOB_RESULT_TTL_SECONDS = 3600
+
+# Progress reported when each stage of a job starts
+JOB_STAGES = {
+    'queued': 0.0,
+    'fetch': 0.1,
+    'process': 0.6,
+    'store': 0.9
+}
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when too many jobs are already queued or running"""
+
+
+class JobManager:
+    """
+    Runs (source, format, params) requests on a bounded worker pool.
+
+    Each finished result is written to data_cache/jobs/ under a key made of the request
+    and its source version (the process start time for sources without files, so their results
+    are never served after a restart), and kept for JOB_RESULT_TTL_SECONDS. Submitting a request whose
+    result is still stored finishes the job immediately; submitting one that is already
+    queued or running returns the existing job.
+    """
+
+    def __init__(self, cache_dir: str = "data_cache", max_workers: int = JOB_MAX_WORKERS,
+                 max_pending: int = JOB_MAX_PENDING, ttl_seconds: float = JOB_RESULT_TTL_SECONDS):
+        self.results_dir = os.path.join(cache_dir, "jobs")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._active: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        if not os.path.exists(self.results_dir):
+            os.makedirs(self.results_dir)
+
+    def submit(self, source: str, format_type: str = "3d_scatter",
+               params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Start a job, or finish it straight away when its result is already stored
+
+        Args:
+            source: Data source identifier
+            format_type: Type of visualization format (binary formats are not supported)
+            params: Parameters for data fetching
+
+        Returns:
+            The job's status
+
+        Raises:
+            ValueError: For unknown sources and binary formats
+            JobQueueFullError: When JOB_MAX_PENDING jobs are already queued or running
+        """
+        params = params or {}
+        if source not in data_processor.registry:
+            raise ValueError(f"Unknown data source: {source}")
+        if format_type in BINARY_FORMATS:
+            raise ValueError(f"Binary format {format_type} cannot be run as a job; request /api/data/{source}")
+
+        version = self._job_version(source)
+        key = self._result_key(source, format_type, params, version)
+        self.purge_expired()
+
+        with self._lock:
+            active = self._active.get(key)
+            if active is not None:
+                return self._status(self._jobs[active])
+
+            job = {
+                'job_id': uuid.uuid4().hex,
+                'key': key,
+                'source': source,
+                'format': format_type,
+                'params': params,
+                'version': version,
+                'state': 'queued',
+                'stage': 'queued',
+                'progress': 0.0,
+                'cached': False,
+                'error': None,
+                'submitted_at': datetime.now(),
+                'started_at': None,
+                'finished_at': None,
+                'expires_at': None
+            }
+            stored = self._read_result_meta(key)
+            if stored is not None:
+                job.update(state='done', stage='done', progress=1.0, cached=True,
+                           finished_at=job['submitted_at'], expires_at=stored['expires_at'])
+                self._jobs[job['job_id']] = job
+                return self._status(job)
+
+            if len(self._active) >= self.max_pending:
+                raise JobQueueFullError(f"Too many jobs in progress (limit {self.max_pending}), try again later")
+            self._jobs[job['job_id']] = job
+            self._active[key] = job['job_id']
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='data-job')
+        self._pool.submit(self._run, job)
+        return self._status(job)
+
+    def stored_result(self, source: str, format_type: str = "3d_scatter",
+                      params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored result of a request for the current version of its source
+
+        Returns:
+            The result, or None if none is stored or it has expired
+        """
+        version = self._job_version(source)
+        if version is None:
+            return None
+        return self._read_result(self._result_key(source, format_type, params or {}, version))
+
+    def store_result(self, source: str, format_type: str, params: Optional[Dict[str, Any]],
+                     result: Dict[str, Any], ttl_seconds: Optional[float] = None) -> Optional[float]:
+        """
+        Store a result computed outside a job (e.g. by manage.py warm) for later requests
+
+        Args:
+            source: Data source identifier
+            format_type: Type of visualization format
+            params: Parameters the result was computed with
+            result: The processed result
+            ttl_seconds: Seconds to keep the result (default the manager's ttl_seconds)
+
+        Returns:
+            The result's expiry time, or None if it was not stored (unversioned sources and binary formats)
+        """
+        params = params or {}
+        version = data_processor.get_source_version(source)
+        if not version or format_type in BINARY_FORMATS:
+            return None
+        key = self._result_key(source, format_type, params, version)
+        return self._write_result(key, source, format_type, params, result, ttl_seconds)
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Get a job's status, with its result once it is done
+
+        Returns:
+            The job's status, or None for unknown or expired jobs
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = self._status(job)
+
+        if include_result and status['state'] == 'done':
+            result = self._read_result(job['key'])
+            if result is None:
+                # The stored result expired or was removed since the job finished
+                with self._lock:
+                    self._jobs.pop(job_id, None)
+                return None
+            status['result'] = result
+        return status
+
+    def purge_expired(self):
+        """Remove expired results from disk and forget the jobs that produced them"""
+        now = time.time()
+        for path in glob.glob(os.path.join(self.results_dir, "*.meta.json")):
+            meta = self._read_json(path)
+            if meta is None or meta.get('expires_at', 0) <= now:
+                for stale in (path, path[:-len(".meta.json")] + ".json"):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job['expires_at'] is not None and job['expires_at'] <= now]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get job counts by state"""
+        with self._lock:
+            states = {}
+            for job in self._jobs.values():
+                states[job['state']] = states.get(job['state'], 0) + 1
+            return {
+                'jobs': len(self._jobs),
+                'states': states,
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+    def _run(self, job: Dict[str, Any]):
+        """Compute a job's result on a worker thread and store it"""
+        self._set(job, state='running', started_at=datetime.now())
+        try:
+            self._set(job, stage='fetch', progress=JOB_STAGES['fetch'])
+            raw_data = data_processor.fetch_data(job['source'], job['params'])
+            if 'error' in raw_data:
+                raise ValueError(raw_data['error'])
+
+            self._set(job, stage='process', progress=JOB_STAGES['process'])
+            result = data_processor.process_data(raw_data, job['format'], job['params'])
+            del raw_data
+            if 'error' in result:
+                raise ValueError(result['error'])
+
+            self._set(job, stage='store', progress=JOB_STAGES['store'])
+            expires_at = None
+            if job['version'] is not None:
+                expires_at = self._write_result(job['key'], job['source'], job['format'], job['params'], result)
+            self._set(job, state='done', stage='done', progress=1.0, finished_at=datetime.now(),
+                      expires_at=expires_at)
+            logger.info(f"Job {job['job_id']} ({job['source']}/{job['format']}) finished")
+        except Exception as e:
+            logger.error(f"Job {job['job_id']} ({job['source']}/{job['format']}) failed: {str(e)}")
+            self._set(job, state='failed', error=str(e), finished_at=datetime.now(),
+                      expires_at=time.time() + self.ttl_seconds)
+        finally:
+            with self._lock:
+                self._active.pop(job['key'], None)
+
+    def _set(self, job: Dict[str, Any], **fields):
+        with self._lock:
+            job.update(fields)
+
+    def _status(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the public status of a job (call with the lock held)"""
+        return {
+            'job_id': job['job_id'],
+            'state': job['state'],
+            'stage': job['stage'],
+            'progress': job['progress'],
+            'source': job['source'],
+            'format': job['format'],
+            'params': job['params'],
+            'cached': job['cached'],
+            'error': job['error'],
+            'submitted_at': job['submitted_at'].isoformat(),
+            'started_at': job['started_at'].isoformat() if job['started_at'] else None,
+            'finished_at': job['finished_at'].isoformat() if job['finished_at'] else None,
+            'expires_at': datetime.fromtimestamp(job['expires_at']).isoformat() if job['expires_at'] else None
+        }
+
+    def _job_version(self, source: str) -> Any:
+        """Get the version job results are keyed by, or None if the source's files are missing"""
+        version = data_processor.get_source_version(source)
+        if version == ():
+            # Simulated sources have no files to version; their results only live as long as this process
+            return ('started', data_processor.started_at.isoformat())
+        return version
+
+    def _result_key(self, source: str, format_type: str, params: Dict[str, Any], version: Any) -> str:
+        """Hash a request, its source version and the code version into the name of its stored result"""
+        spec = json.dumps([source, format_type, canonical_params(params), version, CODE_VERSION], default=str)
+        return hashlib.sha1(spec.encode("utf-8")).hexdigest()
+
+    def _result_path(self, key: str) -> str:
+        return os.path.join(self.results_dir, f"{key}.json")
+
+    def _write_result(self, key: str, source: str, format_type: str, params: Dict[str, Any],
+                      result: Dict[str, Any], ttl_seconds: Optional[float] = None) -> float:
+        """Store a result with its expiry"""
+        expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        path = self._result_path(key)
+        meta = {
+            'source': source,
+            'format': format_type,
+            'params': params,
+            'created_at': time.time(),
+            'expires_at': expires_at
+        }
+        # The result goes first so a meta file always has its result next to it
+        for target, payload in ((path, result), (path[:-len(".json")] + ".meta.json", meta)):
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(payload, f, separators=(',', ':'), default=str)
+            os.replace(tmp_path, target)
+        return expires_at
+
+    def _read_result_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the metadata of a stored result, or None if there is no unexpired one"""
+        meta = self._read_json(self._result_path(key)[:-len(".json")] + ".meta.json")
+        if meta is None or meta.get('expires_at', 0) <= time.time():
+            return None
+        return meta
+
+    def _read_result(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._read_result_meta(key) is None:
+            return None
+        return self._read_json(self._result_path(key))
+
+    def _read_json(self, path: str) -> Optional[Any]:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+# Global job manager instance
+job_manager = JobManager()
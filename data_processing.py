@@ -3,25 +3,192 @@ Data Processing Pipeline for Signpost Observatory
 Handles fetching, processing, and formatting data for 3D visualization projects
 """
 
+import io
 import json
+import zlib
+import struct
+import hashlib
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import requests
-from typing import Dict, List, Any, Optional, Union
+from typing import Callable, Dict, Iterator, List, Any, Optional, Union
 import os
+import re
+import time
 import logging
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from data_cache import ColumnarCache, ResultCache, SingleFlight, canonical_params, code_version, file_version
+from data_registry import DataSource, DataSourceRegistry
+from data_schema import FrameSchema, unify_categories
+from request_timing import current_timer, timed
+from spatial_index import GridIndex, TileIndex, tile_bounds, TILE_MAX_ZOOM, TILE_MAX_POINTS, TILE_AGGREGATION_LEVELS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Simulated sources registered alongside the CSV sources declared in project configs:
+# source id -> (loader method name, public description)
+SIMULATED_SOURCES = {
+    'crime_data': ('_fetch_crime_data', {
+        'name': 'Kansas City Crime Data',
+        'description': 'Crime incidents and statistics for Kansas City metro area',
+        'formats': ['3d_scatter', 'heatmap', 'timeline'],
+        'params': {
+            'n_points': 'Number of data points to generate (default: 100)'
+        }
+    }),
+    'funding_data': ('_fetch_funding_data', {
+        'name': 'Federal Funding Flow',
+        'description': 'Federal funding data across agencies and states',
+        'formats': ['3d_scatter', 'heatmap', 'timeline', 'network'],
+        'params': {
+            'n_agencies': 'Number of agencies to include (default: 20)'
+        }
+    }),
+    'education_data': ('_fetch_education_data', {
+        'name': 'Education Statistics',
+        'description': 'School data including enrollment, performance, and funding',
+        'formats': ['3d_scatter', 'heatmap'],
+        'params': {
+            'n_schools': 'Number of schools to include (default: 50)'
+        }
+    }),
+    'democracy_data': ('_fetch_democracy_data', {
+        'name': 'Democracy Metrics',
+        'description': 'Voting data, gerrymandering scores, and demographic information',
+        'formats': ['3d_scatter', 'heatmap', 'network'],
+        'params': {
+            'n_districts': 'Number of districts to include (default: 100)'
+        }
+    })
+}
+
+# Comparison operators accepted in query predicates
+QUERY_OPERATORS = {
+    '==': lambda col, value: col == value,
+    '!=': lambda col, value: col != value,
+    '>': lambda col, value: col > value,
+    '>=': lambda col, value: col >= value,
+    '<': lambda col, value: col < value,
+    '<=': lambda col, value: col <= value,
+    'in': lambda col, value: col.isin(value if isinstance(value, list) else [value])
+}
+PREDICATE_PATTERN = re.compile(r'^\s*(.+?)\s*(==|!=|>=|<=|>|<)\s*(.+?)\s*$')
+
+# Candidate column names for coordinates, matched case-insensitively
+LATITUDE_COLUMNS = ['latitude', 'lat']
+LONGITUDE_COLUMNS = ['longitude', 'lng', 'lon']
+
+# Columns summed into aggregated tile points, matched case-insensitively
+TILE_WEIGHT_COLUMNS = ['crashcount', 'count', 'weight', 'severity']
+
+# Simulated sources are generated from a per-call seeded generator relative to a fixed date,
+# so the same params always produce the same data
+SYNTHETIC_SEED = 42
+SYNTHETIC_REFERENCE_DATE = datetime(2024, 12, 31)
+
+# Geographic heatmap defaults
+GEO_HEATMAP_GRID_SIZE = 64
+# Largest rows or cols a request may ask for; a dense grid is serialized cell by cell
+GEO_HEATMAP_MAX_GRID_SIZE = 1024
+GEO_HEATMAP_AGGREGATIONS = ['count', 'sum', 'mean', 'max']
+
+# Percentiles reported per bucket by the timeline summary
+TIMELINE_PERCENTILES = [0.25, 0.5, 0.75, 0.9]
+TIMELINE_ITEMS_PAGE_SIZE = 100
+
+# Rows converted to records per chunk when streaming records
+STREAM_CHUNK_SIZE = 5000
+
+# Workers used to parse and load the files of multi-file CSV sources
+CSV_LOAD_WORKERS = os.cpu_count() or 1
+
+# Parse workers are started from a clean process, never forked from the threaded server
+CSV_PARSE_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Binary point-cloud layout: magic, uint32 header length, JSON header, then 4-byte aligned arrays
+POINT_CLOUD_MAGIC = b'SPC1'
+POINT_CLOUD_VERSION = 1
+
+# Point colors by substring of the item type, first match wins
+ITEM_TYPE_COLORS = [
+    ('Theft', '#ff6b6b'),
+    ('Assault', '#ff8e53'),
+    ('Education', '#4ecdc4'),
+    ('Health', '#45b7d1'),
+    ('Defense', '#96ceb4')
+]
+DEFAULT_ITEM_COLOR = '#f7f1e3'
+
+# Fields each 3D scatter attribute is read from, first present wins, and its value otherwise
+SCATTER_FIELDS = {
+    'x': (['longitude', 'month'], 0),
+    'y': (['latitude', 'funding_amount'], 0),
+    'z': (['severity', 'enrollment', 'voter_turnout'], 0),
+    'size': (['severity', 'enrollment', 'funding_amount'], 1),
+    'label': (['type', 'agency', 'name', 'district_name'], '')
+}
+
+SCATTER_VISUALIZATION_CONFIG = {
+    'x_label': 'Longitude/Month/Funding',
+    'y_label': 'Latitude/Amount/Enrollment',
+    'z_label': 'Severity/Size/Turnout',
+    'color_scale': 'viridis',
+    'size_range': [0.1, 2.0]
+}
+
+# Formats whose results are a packed binary body rather than JSON
+BINARY_FORMATS = ['3d_scatter_bin']
+
+# Formats built column-wise from a CSV source's cached frame, without per-record dicts
+FRAME_FORMATS = ['3d_scatter_bin', 'geo_heatmap']
+
+# Batch requests: most sub-requests per batch and threads fetching distinct sources at once
+BATCH_MAX_REQUESTS = 32
+BATCH_MAX_WORKERS = 4
+
+# Version of the code shaping response bodies; strong ETags and stored results include it, so
+# clients never revalidate (and the server never serves) a body built by a previous deploy
+CODE_VERSION = code_version(os.path.dirname(os.path.abspath(__file__)))
+
+# Processed result cache sizing
+RESULT_CACHE_MAX_ENTRIES = 64
+RESULT_CACHE_TTL_SECONDS = 600
+
+# Tiles and timeline bucket maps get caches of their own, so panning across many tiles or paging
+# through timelines never evicts processed results; bucket maps hold a source's whole record list
+TILE_CACHE_MAX_ENTRIES = 512
+TIMELINE_BUCKET_CACHE_MAX_ENTRIES = 8
+
+# Seconds a request waits for an identical request already being computed before giving up
+SINGLE_FLIGHT_TIMEOUT_SECONDS = 120
+
 class DataProcessor:
     """Main data processing class for handling various data sources and formats"""
     
     def __init__(self):
         self.cache_dir = "data_cache"
         self.ensure_cache_directory()
+        self.columnar_cache = ColumnarCache(self.cache_dir)
+        self.result_cache = ResultCache(RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL_SECONDS)
+        self.tile_cache = ResultCache(TILE_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL_SECONDS)
+        self.timeline_bucket_cache = ResultCache(TIMELINE_BUCKET_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL_SECONDS)
+        self.single_flight = SingleFlight(SINGLE_FLIGHT_TIMEOUT_SECONDS)
+        self._spatial_indexes = {}
+        # Process pool parsing uncached files of multi-file sources, started on first use
+        self._parse_pool = None
+        self._parse_pool_lock = threading.Lock()
+        # Simulated data only changes with the code, so it is versioned by process start
+        self.started_at = datetime.now(timezone.utc)
+        self.registry = DataSourceRegistry()
+        for source_id, (loader_name, info) in SIMULATED_SOURCES.items():
+            self.registry.register(DataSource(source_id, 'simulated', loader=getattr(self, loader_name), **info))
         
     def ensure_cache_directory(self):
         """Ensure the cache directory exists"""
@@ -40,97 +207,491 @@ class DataProcessor:
             Dictionary containing the fetched data and metadata
         """
         try:
-            if source == "crime_data":
-                return self._fetch_crime_data(params)
-            elif source == "funding_data":
-                return self._fetch_funding_data(params)
-            elif source == "education_data":
-                return self._fetch_education_data(params)
-            elif source == "democracy_data":
-                return self._fetch_democracy_data(params)
-            elif source == "kansas_city_crashes":
-                return self._fetch_csv_data("kansas-city-crashes", "crashes", params)
-            elif source == "kansas_city_intersections":
-                return self._fetch_csv_data("kansas-city-crashes", "intersections", params)
-            elif source == "kansas_city_gps":
-                return self._fetch_csv_data("kansas-city-crashes", "gps", params)
-            else:
+            data_source = self.registry.get(source)
+            if data_source is None:
                 raise ValueError(f"Unknown data source: {source}")
+            with timed('fetch', source):
+                if data_source.kind == 'csv':
+                    return self._fetch_csv_data(data_source, params)
+                return data_source.loader(params)
         except Exception as e:
             logger.error(f"Error fetching data from {source}: {str(e)}")
             return {"error": str(e), "source": source}
     
-    def process_data(self, raw_data: Dict[str, Any], format_type: str = "3d_scatter") -> Dict[str, Any]:
+    def iter_records(self, source: str, params: Optional[Dict[str, Any]] = None,
+                     chunksize: int = STREAM_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a source's records one at a time, converting them in chunks
+        
+        CSV sources are loaded like fetch_data (every resolved file, compacted by the source's
+        schema and served from the columnar cache) and queried once; only the records are
+        built lazily, so memory for them stays bounded by the chunk size.
+        
+        Args:
+            source: Data source identifier
+            params: Query parameters, as for fetch_data
+            chunksize: Number of rows converted to records at a time
+            
+        Yields:
+            JSON-serializable record dictionaries
+        """
+        data_source = self._csv_source(source)
+        if data_source is None:
+            # Simulated sources are generated in memory anyway
+            raw_data = self.fetch_data(source, params)
+            if 'error' in raw_data:
+                raise ValueError(raw_data['error'])
+            yield from raw_data['data']
+            return
+        
+        df, _ = self._load_csv_frame(data_source)
+        df, _ = self._apply_query(df, params)
+        for start in range(0, len(df), chunksize):
+            yield from self._frame_to_records(df.iloc[start:start + chunksize])
+    
+    def spatial_query(self, source: str, bbox: Optional[List[float]] = None, near: Optional[List[float]] = None,
+                      radius: Optional[float] = None, knn: Optional[int] = None,
+                      params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Query a source's records by location using its spatial index
+        
+        Args:
+            source: Data source identifier (must have latitude/longitude columns)
+            bbox: [min_lat, min_lng, max_lat, max_lng] to return every record inside
+            near: [lat, lng] center for radius and nearest-neighbour queries
+            radius: Distance in meters around near
+            knn: Number of nearest records to near
+            params: Query parameters applied to the matches (where, columns, offset, limit)
+            
+        Returns:
+            Dictionary containing the matching records and metadata; radius and nearest
+            queries add a distance_m field and are ordered nearest first
+        """
+        try:
+            data_source = self._csv_source(source)
+            if data_source is None:
+                raise ValueError(f"Spatial queries are not supported for source: {source}")
+            df, files = self._load_csv_frame(data_source)
+            index = self._get_spatial_index(source, df, files)
+            
+            start = time.perf_counter()
+            distances = None
+            if bbox is not None:
+                positions = index.bbox(*bbox)
+            elif near is not None and knn is not None:
+                positions, distances = index.nearest(near[0], near[1], int(knn))
+            elif near is not None and radius is not None:
+                positions, distances = index.radius(near[0], near[1], float(radius))
+            else:
+                raise ValueError("Provide bbox, near with radius, or near with knn")
+            query_ms = (time.perf_counter() - start) * 1000
+            
+            matches = df.iloc[positions]
+            if distances is not None:
+                matches = matches.assign(distance_m=distances)
+            matches, matched_records = self._apply_query(matches, params)
+            data = self._frame_to_records(matches)
+            
+            return {
+                'data': data,
+                'metadata': {
+                    'source': source,
+                    'file_path': files[0]['file_path'],
+                    'files': files,
+                    'total_records': len(data),
+                    'matched_records': matched_records,
+                    'query': {'bbox': bbox, 'near': near, 'radius': radius, 'knn': knn},
+                    'query_time_ms': query_ms
+                }
+            }
+        except Exception as e:
+            logger.error(f"Error querying spatial data from {source}: {str(e)}")
+            return {"error": str(e), "source": source}
+    
+    def get_tile(self, source: str, z: int, x: int, y: int) -> Dict[str, Any]:
+        """
+        Get a level-of-detail tile of 3D scatter points (Web Mercator z/x/y scheme)
+        
+        Tiles with few points hold the raw points formatted like 3d_scatter; denser tiles
+        hold one aggregated point per sub-tile with its point count and summed weight.
+        Results are cached per source version.
+        
+        Args:
+            source: Data source identifier (must have latitude/longitude columns)
+            z: Zoom level
+            x: Tile column
+            y: Tile row
+            
+        Returns:
+            Dictionary containing the tile's points and metadata
+        """
+        try:
+            data_source = self._csv_source(source)
+            if data_source is None:
+                raise ValueError(f"Tiles are not supported for source: {source}")
+            
+            cache_key = ('tile', source, z, x, y)
+            version = self.get_source_version(source)
+            found, cached = self.tile_cache.get(cache_key, version)
+            if found:
+                return cached
+            
+            df, files = self._load_csv_frame(data_source)
+            index = self._get_spatial_index(source, df, files, 'tiles')
+            with timed('process', 'tile'):
+                tile = index.tile(z, x, y)
+                if tile['aggregated']:
+                    points = self._format_tile_cells(tile['cells'], f"{z}/{x}/{y}")
+                else:
+                    points = self._format_tile_points(df.iloc[tile['positions']])
+            
+            result = {
+                'type': '3d_scatter_tile',
+                'tile': {
+                    'z': z,
+                    'x': x,
+                    'y': y,
+                    'bounds': list(tile_bounds(z, x, y)),
+                    'aggregated': tile['aggregated'],
+                    'count': tile['count']
+                },
+                'data': points,
+                'metadata': {
+                    'source': source,
+                    'file_path': files[0]['file_path'],
+                    'files': files,
+                    'total_records': len(points)
+                },
+                'visualization_config': {
+                    'x_label': 'Longitude',
+                    'y_label': 'Latitude',
+                    'z_label': 'Weight' if tile['aggregated'] else 'Severity',
+                    'color_scale': 'viridis',
+                    'size_range': [0.1, 2.0]
+                }
+            }
+            self.tile_cache.put(cache_key, version, result)
+            return result
+        except Exception as e:
+            logger.error(f"Error building tile {z}/{x}/{y} for {source}: {str(e)}")
+            return {"error": str(e), "source": source}
+    
+    def get_tile_info(self, source: str) -> Dict[str, Any]:
+        """Get the bounds and zoom range of a source's tiles"""
+        try:
+            data_source = self._csv_source(source)
+            if data_source is None:
+                raise ValueError(f"Tiles are not supported for source: {source}")
+            df, files = self._load_csv_frame(data_source)
+            index = self._get_spatial_index(source, df, files, 'tiles')
+            return {
+                'source': source,
+                'total_points': index.size,
+                'bounds': list(index.bounds) if index.bounds else None,
+                'min_zoom': 0,
+                'max_zoom': TILE_MAX_ZOOM,
+                'max_points_per_tile': TILE_MAX_POINTS,
+                'tile_url': f"/api/data/{source}/tiles/{{z}}/{{x}}/{{y}}"
+            }
+        except Exception as e:
+            logger.error(f"Error reading tile info for {source}: {str(e)}")
+            return {"error": str(e), "source": source}
+    
+    def tile_etag(self, source: str, z: int, x: int, y: int) -> Optional[str]:
+        """Get a strong ETag for a tile without building it, or None if the source is unavailable"""
+        version = self.get_source_version(source)
+        if self._csv_source(source) is None or version is None:
+            return None
+        key = repr((source, CODE_VERSION, version, z, x, y, TILE_MAX_POINTS, TILE_AGGREGATION_LEVELS))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    def data_validators(self, source: str, *parts: Any) -> Optional[tuple]:
+        """
+        Get the ETag and Last-Modified time of a data response without fetching any data
+        
+        Args:
+            source: Data source identifier
+            parts: Whatever else the response depends on (endpoint, format, canonical params)
+            
+        Returns:
+            Tuple of (strong ETag, Last-Modified datetime), or None for unknown or missing sources
+        """
+        if source not in self.registry:
+            return None
+        version = self.get_source_version(source)
+        if version is None:
+            return None
+        if version:
+            last_modified = datetime.fromtimestamp(max(mtime_ns for _, mtime_ns, _ in version) / 1e9, tz=timezone.utc)
+        else:
+            version = ('started', self.started_at.isoformat())
+            last_modified = self.started_at
+        key = repr((source, CODE_VERSION, version) + parts)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest(), last_modified
+    
+    def _format_tile_points(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Format a fine tile's raw rows as 3D scatter points"""
+        if df.empty:
+            return []
+        
+        # The scatter formatter reads lowercase coordinate keys
+        lat_col = self._find_column(df, LATITUDE_COLUMNS)
+        lng_col = self._find_column(df, LONGITUDE_COLUMNS)
+        records = self._frame_to_records(df)
+        for record in records:
+            record.setdefault('latitude', record[lat_col])
+            record.setdefault('longitude', record[lng_col])
+        return self._format_3d_scatter({'data': records})['data']
+    
+    def _format_tile_cells(self, cells: Dict[str, np.ndarray], tile_id: str) -> List[Dict[str, Any]]:
+        """Format an aggregated tile's sub-tiles as 3D scatter points"""
+        counts = cells['count']
+        weights = cells.get('weight', counts)
+        sizes = np.clip(np.log10(counts + 1) / 2, 0.1, 2.0)
+        
+        points = []
+        for i in range(len(counts)):
+            count = int(counts[i])
+            points.append({
+                'id': f"{tile_id}/{i}",
+                'x': float(cells['lng'][i]),
+                'y': float(cells['lat'][i]),
+                'z': float(weights[i]),
+                'color': '#f7f1e3',
+                'size': float(sizes[i]),
+                'label': f"{count} points",
+                'description': f"{count} points aggregated",
+                'count': count,
+                'weight': float(weights[i]),
+                'representative_id': int(cells['representative'][i])
+            })
+        return points
+    
+    def _get_spatial_index(self, source: str, df: pd.DataFrame, files: List[Dict[str, Any]], kind: str = 'grid'):
+        """
+        Get a spatial index ('grid' or 'tiles') for a CSV source, building it once per version of its files
+        
+        When rows were only appended to the last file since the cached tile quadtree was
+        built, the new rows are merged into it instead of rebuilding it.
+        """
+        version = tuple(file_version(f['file_path']) for f in files)
+        cached = self._spatial_indexes.get((kind, source))
+        if cached and cached[0] == version:
+            return cached[1]
+        
+        lat_col = self._find_column(df, LATITUDE_COLUMNS)
+        lng_col = self._find_column(df, LONGITUDE_COLUMNS)
+        if lat_col is None or lng_col is None:
+            raise ValueError("Spatial queries require latitude and longitude columns")
+        
+        start = 0
+        if kind == 'tiles' and cached and cached[0][:-1] == version[:-1] and len(cached[0]) == len(version):
+            manifest = self.columnar_cache.manifest(files[-1]['file_path'], self.registry.get(source).schema) or {}
+            previous_rows = len(df) - files[-1]['rows'] + manifest.get('previous_rows', -1)
+            if tuple(manifest.get('appended_to', ())) == cached[0][-1] and previous_rows == cached[1].length:
+                start = cached[1].length
+        
+        with timed('index', f"build {kind} index"):
+            rows = df.iloc[start:]
+            lats = pd.to_numeric(rows[lat_col], errors='coerce').to_numpy()
+            lngs = pd.to_numeric(rows[lng_col], errors='coerce').to_numpy()
+            
+            if kind == 'tiles':
+                weight_col = self._find_column(df, TILE_WEIGHT_COLUMNS)
+                weights = pd.to_numeric(rows[weight_col], errors='coerce').to_numpy() if weight_col else None
+                if start:
+                    index = cached[1].extend(lats, lngs, weights)
+                    logger.info(f"Extended tile quadtree for {source} with {len(rows)} appended rows")
+                else:
+                    index = TileIndex(lats, lngs, weights)
+                    logger.info(f"Built tile quadtree for {source}: {index.size} points")
+            else:
+                index = GridIndex(lats, lngs)
+                logger.info(f"Built spatial index for {source}: {index.size} points in {index.rows}x{index.cols} cells")
+        
+        self._spatial_indexes[(kind, source)] = (version, index)
+        return index
+    
+    def ingest_project(self, project: str) -> List[Dict[str, Any]]:
+        """
+        Bring the cached data of a project's CSV sources up to date with its raw files
+        
+        New files are picked up by re-resolving the project's sources. Files that only had
+        rows appended since they were cached have just those rows parsed and merged into the
+        columnar cache; rewritten files are parsed in full.
+        
+        Args:
+            project: Project directory name (e.g., 'kansas-city-crashes')
+            
+        Returns:
+            One report per source file with its status ('unchanged', 'appended' or 'parsed'),
+            rows added, total rows and elapsed seconds
+        """
+        self.registry.refresh()
+        data_sources = self.registry.project_sources(project)
+        if not data_sources:
+            raise ValueError(f"No data sources declared for project: {project}")
+        
+        report = []
+        for data_source in data_sources:
+            if not data_source.files:
+                report.append({'source': data_source.source_id, 'file': None, 'status': 'missing',
+                               'rows_added': 0, 'total_rows': 0, 'seconds': 0.0})
+                continue
+            for csv_path in data_source.files:
+                start = time.perf_counter()
+                df, manifest = self.columnar_cache.update(csv_path, self._parse_csv, data_source.schema)
+                unchanged = manifest['status'] == 'cached'
+                report.append({
+                    'source': data_source.source_id,
+                    'file': csv_path,
+                    'status': 'unchanged' if unchanged else manifest['status'],
+                    'rows_added': 0 if unchanged else manifest['rows_added'],
+                    'total_rows': len(df),
+                    'seconds': time.perf_counter() - start
+                })
+        return report
+    
+    def get_source_version(self, source: str) -> Optional[tuple]:
+        """
+        Get a version identifier that changes whenever a source's underlying data changes
+        
+        Args:
+            source: Data source identifier
+            
+        The raw directory's mtime and the resolved file names are included, so adding,
+        removing or renaming a file changes the version even when the remaining files do not.
+        
+        Returns:
+            Tuple of (name, mtime_ns, size) entries for CSV sources, an empty tuple for
+            simulated sources, or None if the source files cannot be found
+        """
+        data_source = self._csv_source(source)
+        if data_source is None:
+            return ()
+        try:
+            try:
+                files = self.registry.files(source)
+                return self._files_version(data_source, files)
+            except FileNotFoundError:
+                # A resolved file was removed or renamed; resolve again before giving up
+                files = self.registry.files(source, refresh=True)
+                return self._files_version(data_source, files)
+        except (FileNotFoundError, OSError):
+            return None
+    
+    def _files_version(self, data_source: DataSource, files: List[str]) -> tuple:
+        """Get the version entries of a source's raw directory and resolved files"""
+        entries = [('.', os.stat(data_source.raw_dir).st_mtime_ns, 0)]
+        for path in files:
+            entries.append((os.path.basename(path),) + file_version(path))
+        return tuple(entries)
+    
+    def _csv_source(self, source: str) -> Optional[DataSource]:
+        """Get a registered CSV source, or None for simulated or unknown sources"""
+        data_source = self.registry.get(source)
+        if data_source is None or data_source.kind != 'csv':
+            return None
+        return data_source
+    
+    def process_data(self, raw_data: Dict[str, Any], format_type: str = "3d_scatter",
+                     params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Process raw data into formats suitable for 3D visualization
         
         Args:
             raw_data: Raw data dictionary
-            format_type: Type of visualization format ("3d_scatter", "heatmap", "timeline", "network")
+            format_type: Type of visualization format ("3d_scatter", "3d_scatter_bin", "heatmap",
+                         "geo_heatmap", "timeline", "timeline_summary", "network")
+            params: Optional format parameters (see the individual formatters)
             
         Returns:
             Processed data ready for 3D visualization
         """
         try:
-            if format_type == "3d_scatter":
-                return self._format_3d_scatter(raw_data)
-            elif format_type == "heatmap":
-                return self._format_heatmap(raw_data)
-            elif format_type == "timeline":
-                return self._format_timeline(raw_data)
-            elif format_type == "network":
-                return self._format_network(raw_data)
-            else:
-                raise ValueError(f"Unknown format type: {format_type}")
+            with timed('process', format_type):
+                if format_type == "3d_scatter":
+                    return self._format_3d_scatter(raw_data)
+                elif format_type == "3d_scatter_bin":
+                    return self._format_3d_scatter_bin(raw_data)
+                elif format_type == "heatmap":
+                    return self._format_heatmap(raw_data)
+                elif format_type == "geo_heatmap":
+                    return self._format_geo_heatmap(raw_data, params)
+                elif format_type == "timeline":
+                    return self._format_timeline(raw_data)
+                elif format_type == "timeline_summary":
+                    return self._format_timeline_summary(raw_data)
+                elif format_type == "network":
+                    return self._format_network(raw_data, params)
+                else:
+                    raise ValueError(f"Unknown format type: {format_type}")
         except Exception as e:
             logger.error(f"Error processing data: {str(e)}")
             return {"error": str(e), "format_type": format_type}
     
     def _fetch_crime_data(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Fetch crime data (simulated for now)"""
+        df = self._generate_crime_frame(params)
+        
+        return {
+            'data': self._frame_to_records(df),
+            'metadata': {
+                'source': 'crime_data',
+                'total_records': len(df),
+                'date_range': {
+                    'start': df['timestamp'].min() if len(df) else None,
+                    'end': df['timestamp'].max() if len(df) else None
+                },
+                'crime_types': self._present_categories(df['type']),
+                'neighborhoods': self._present_categories(df['neighborhood'])
+            }
+        }
+    
+    def _generate_crime_frame(self, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Generate simulated crime incidents as columns"""
         # Simulate crime data for Kansas City
-        np.random.seed(42)
-        n_points = params.get('n_points', 100) if params else 100
+        params = params or {}
+        rng = self._synthetic_rng(params)
+        n_points = int(params.get('n_points', 100))
         
         # Generate realistic crime data
         crime_types = ['Theft', 'Assault', 'Vandalism', 'Burglary', 'Traffic']
         neighborhoods = ['Downtown', 'Westport', 'Plaza', 'Brookside', 'Waldo']
         
-        data = []
-        for i in range(n_points):
-            # Generate coordinates within Kansas City bounds
-            lat = 39.0997 + np.random.normal(0, 0.01)  # Kansas City latitude
-            lng = -94.5786 + np.random.normal(0, 0.01)  # Kansas City longitude
-            
-            data.append({
-                'id': i,
-                'type': np.random.choice(crime_types),
-                'neighborhood': np.random.choice(neighborhoods),
-                'latitude': lat,
-                'longitude': lng,
-                'timestamp': (datetime.now() - timedelta(days=np.random.randint(0, 365))).isoformat(),
-                'severity': np.random.randint(1, 10),
-                'description': f"Crime incident #{i}"
-            })
+        return pd.DataFrame({
+            'id': np.arange(n_points),
+            'type': self._synthetic_choice(rng, crime_types, n_points),
+            'neighborhood': self._synthetic_choice(rng, neighborhoods, n_points),
+            # Coordinates within Kansas City bounds
+            'latitude': 39.0997 + rng.normal(0, 0.01, n_points),
+            'longitude': -94.5786 + rng.normal(0, 0.01, n_points),
+            'timestamp': self._synthetic_timestamps(rng, 365, n_points),
+            'severity': rng.integers(1, 10, n_points),
+            'description': [f"Crime incident #{i}" for i in range(n_points)]
+        })
+    
+    def _fetch_funding_data(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Fetch federal funding data (simulated)"""
+        df = self._generate_funding_frame(params)
         
         return {
-            'data': data,
+            'data': self._frame_to_records(df),
             'metadata': {
-                'source': 'crime_data',
-                'total_records': len(data),
-                'date_range': {
-                    'start': min(d['timestamp'] for d in data),
-                    'end': max(d['timestamp'] for d in data)
-                },
-                'crime_types': list(set(d['type'] for d in data)),
-                'neighborhoods': list(set(d['neighborhood'] for d in data))
+                'source': 'funding_data',
+                'total_records': len(df),
+                'total_funding': float(df['funding_amount'].sum()),
+                'agencies': self._present_categories(df['agency']),
+                'categories': self._present_categories(df['funding_category']),
+                'states': self._present_categories(df['recipient_state'])
             }
         }
     
-    def _fetch_funding_data(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Fetch federal funding data (simulated)"""
-        np.random.seed(42)
-        n_agencies = params.get('n_agencies', 20) if params else 20
+    def _generate_funding_frame(self, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Generate simulated monthly funding per agency as columns"""
+        params = params or {}
+        rng = self._synthetic_rng(params)
+        n_agencies = int(params.get('n_agencies', 20))
         
         agencies = [
             'Department of Education', 'Department of Health', 'Department of Transportation',
@@ -141,217 +702,415 @@ class DataProcessor:
             'NASA', 'National Science Foundation', 'Small Business Administration',
             'Environmental Protection Agency', 'General Services Administration'
         ]
+        year = 2024
+        n_rows = n_agencies * 12
         
-        data = []
-        for i in range(n_agencies):
-            agency = agencies[i % len(agencies)]
-            base_funding = np.random.uniform(1e9, 1e12)  # 1B to 1T
-            year = 2024
-            
-            for month in range(1, 13):
-                # Add some variation month to month
-                variation = np.random.normal(1, 0.1)
-                monthly_funding = base_funding / 12 * variation
-                
-                data.append({
-                    'id': f"{agency}_{year}_{month}",
-                    'agency': agency,
-                    'year': year,
-                    'month': month,
-                    'funding_amount': monthly_funding,
-                    'funding_category': np.random.choice(['Grants', 'Contracts', 'Direct Spending']),
-                    'recipient_state': np.random.choice(['MO', 'KS', 'CA', 'TX', 'NY', 'FL', 'IL', 'PA', 'OH', 'GA']),
-                    'program_type': np.random.choice(['Research', 'Infrastructure', 'Education', 'Healthcare', 'Defense'])
-                })
+        # One row per agency per month, with some variation month to month
+        agency_codes = np.repeat(np.arange(n_agencies) % len(agencies), 12)
+        months = np.tile(np.arange(1, 13), n_agencies)
+        base_funding = np.repeat(rng.uniform(1e9, 1e12, n_agencies), 12)  # 1B to 1T
+        monthly_funding = base_funding / 12 * rng.normal(1, 0.1, n_rows)
         
-        return {
-            'data': data,
-            'metadata': {
-                'source': 'funding_data',
-                'total_records': len(data),
-                'total_funding': sum(d['funding_amount'] for d in data),
-                'agencies': list(set(d['agency'] for d in data)),
-                'categories': list(set(d['funding_category'] for d in data)),
-                'states': list(set(d['recipient_state'] for d in data))
-            }
-        }
+        # Ids repeat per agency/month pair, so format each pair once and index into them
+        pair_ids = np.array([f"{agency}_{year}_{month}" for agency in agencies for month in range(1, 13)], dtype=object)
+        
+        return pd.DataFrame({
+            'id': pair_ids[agency_codes * 12 + months - 1],
+            'agency': pd.Categorical.from_codes(agency_codes, agencies),
+            'year': np.full(n_rows, year),
+            'month': months,
+            'funding_amount': monthly_funding,
+            'funding_category': self._synthetic_choice(rng, ['Grants', 'Contracts', 'Direct Spending'], n_rows),
+            'recipient_state': self._synthetic_choice(rng, ['MO', 'KS', 'CA', 'TX', 'NY', 'FL', 'IL', 'PA', 'OH', 'GA'], n_rows),
+            'program_type': self._synthetic_choice(rng, ['Research', 'Infrastructure', 'Education', 'Healthcare', 'Defense'], n_rows)
+        })
     
     def _fetch_education_data(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Fetch education data (simulated)"""
-        np.random.seed(42)
-        n_schools = params.get('n_schools', 50) if params else 50
-        
-        school_types = ['Elementary', 'Middle', 'High', 'Charter', 'Private']
-        districts = ['Kansas City', 'Independence', 'Blue Springs', 'Lee\'s Summit', 'Raytown']
-        
-        data = []
-        for i in range(n_schools):
-            school_type = np.random.choice(school_types)
-            district = np.random.choice(districts)
-            
-            # Generate realistic coordinates within the metro area
-            lat = 39.0997 + np.random.normal(0, 0.02)
-            lng = -94.5786 + np.random.normal(0, 0.02)
-            
-            data.append({
-                'id': i,
-                'name': f"{district} {school_type} School #{i}",
-                'type': school_type,
-                'district': district,
-                'latitude': lat,
-                'longitude': lng,
-                'enrollment': np.random.randint(200, 2000),
-                'graduation_rate': np.random.uniform(0.6, 1.0),
-                'test_scores': np.random.uniform(60, 95),
-                'funding_per_student': np.random.uniform(8000, 15000),
-                'teacher_ratio': np.random.uniform(15, 25)
-            })
+        df = self._generate_education_frame(params)
         
         return {
-            'data': data,
+            'data': self._frame_to_records(df),
             'metadata': {
                 'source': 'education_data',
-                'total_schools': len(data),
-                'total_enrollment': sum(d['enrollment'] for d in data),
-                'school_types': list(set(d['type'] for d in data)),
-                'districts': list(set(d['district'] for d in data))
+                'total_schools': len(df),
+                'total_enrollment': int(df['enrollment'].sum()),
+                'school_types': self._present_categories(df['type']),
+                'districts': self._present_categories(df['district'])
             }
         }
     
-    def _fetch_democracy_data(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Fetch democracy-related data (simulated)"""
-        np.random.seed(42)
-        n_districts = params.get('n_districts', 100) if params else 100
+    def _generate_education_frame(self, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Generate simulated schools as columns"""
+        params = params or {}
+        rng = self._synthetic_rng(params)
+        n_schools = int(params.get('n_schools', 50))
         
-        states = ['MO', 'KS', 'CA', 'TX', 'NY', 'FL', 'IL', 'PA', 'OH', 'GA']
+        school_types = ['Elementary', 'Middle', 'High', 'Charter', 'Private']
+        districts = ['Kansas City', 'Independence', 'Blue Springs', 'Lee\'s Summit', 'Raytown']
+        school_type = self._synthetic_choice(rng, school_types, n_schools)
+        district = self._synthetic_choice(rng, districts, n_schools)
+        name_prefixes = np.array([f"{d} {t} School #" for d in districts for t in school_types], dtype=object)
+        prefixes = name_prefixes[district.cat.codes.to_numpy() * len(school_types) + school_type.cat.codes.to_numpy()]
         
-        data = []
-        for i in range(n_districts):
-            state = np.random.choice(states)
-            
-            data.append({
-                'id': i,
-                'district_name': f"District {i}",
-                'state': state,
-                'population': np.random.randint(500000, 800000),
-                'voter_turnout': np.random.uniform(0.3, 0.8),
-                'partisan_lean': np.random.uniform(-1, 1),  # -1 to 1 scale
-                'gerrymander_score': np.random.uniform(0, 1),  # 0 = fair, 1 = gerrymandered
-                'demographic_diversity': np.random.uniform(0.1, 0.9),
-                'income_inequality': np.random.uniform(0.2, 0.8),
-                'education_level': np.random.uniform(0.2, 0.9)
-            })
+        return pd.DataFrame({
+            'id': np.arange(n_schools),
+            'name': [f"{prefix}{i}" for i, prefix in enumerate(prefixes)],
+            'type': school_type,
+            'district': district,
+            # Realistic coordinates within the metro area
+            'latitude': 39.0997 + rng.normal(0, 0.02, n_schools),
+            'longitude': -94.5786 + rng.normal(0, 0.02, n_schools),
+            'enrollment': rng.integers(200, 2000, n_schools),
+            'graduation_rate': rng.uniform(0.6, 1.0, n_schools),
+            'test_scores': rng.uniform(60, 95, n_schools),
+            'funding_per_student': rng.uniform(8000, 15000, n_schools),
+            'teacher_ratio': rng.uniform(15, 25, n_schools)
+        })
+    
+    def _fetch_democracy_data(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Fetch democracy-related data (simulated)"""
+        df = self._generate_democracy_frame(params)
         
         return {
-            'data': data,
+            'data': self._frame_to_records(df),
             'metadata': {
                 'source': 'democracy_data',
-                'total_districts': len(data),
-                'total_population': sum(d['population'] for d in data),
-                'states': list(set(d['state'] for d in data)),
-                'avg_voter_turnout': np.mean([d['voter_turnout'] for d in data]),
-                'avg_gerrymander_score': np.mean([d['gerrymander_score'] for d in data])
+                'total_districts': len(df),
+                'total_population': int(df['population'].sum()),
+                'states': self._present_categories(df['state']),
+                'avg_voter_turnout': float(df['voter_turnout'].mean()),
+                'avg_gerrymander_score': float(df['gerrymander_score'].mean())
             }
         }
     
-    def _fetch_csv_data(self, project: str, data_type: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _generate_democracy_frame(self, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Generate simulated congressional districts as columns"""
+        params = params or {}
+        rng = self._synthetic_rng(params)
+        n_districts = int(params.get('n_districts', 100))
+        
+        states = ['MO', 'KS', 'CA', 'TX', 'NY', 'FL', 'IL', 'PA', 'OH', 'GA']
+        
+        return pd.DataFrame({
+            'id': np.arange(n_districts),
+            'district_name': [f"District {i}" for i in range(n_districts)],
+            'state': self._synthetic_choice(rng, states, n_districts),
+            'population': rng.integers(500000, 800000, n_districts),
+            'voter_turnout': rng.uniform(0.3, 0.8, n_districts),
+            'partisan_lean': rng.uniform(-1, 1, n_districts),  # -1 to 1 scale
+            'gerrymander_score': rng.uniform(0, 1, n_districts),  # 0 = fair, 1 = gerrymandered
+            'demographic_diversity': rng.uniform(0.1, 0.9, n_districts),
+            'income_inequality': rng.uniform(0.2, 0.8, n_districts),
+            'education_level': rng.uniform(0.2, 0.9, n_districts)
+        })
+    
+    def _synthetic_rng(self, params: Dict[str, Any]) -> np.random.Generator:
+        """Get a fresh random generator for one call, so the same params give the same data"""
+        return np.random.default_rng(int(params.get('seed', SYNTHETIC_SEED)))
+    
+    def _synthetic_choice(self, rng: np.random.Generator, options: List[str], size: int) -> pd.Series:
+        """Draw values from a list of options as a categorical column"""
+        return pd.Series(pd.Categorical.from_codes(rng.integers(0, len(options), size), options))
+    
+    def _synthetic_timestamps(self, rng: np.random.Generator, max_days: int, size: int) -> np.ndarray:
+        """Draw ISO timestamps up to max_days before the fixed reference date"""
+        # Format each possible day once and index into them
+        days = [(SYNTHETIC_REFERENCE_DATE - timedelta(days=d)).isoformat() for d in range(max_days)]
+        return np.array(days, dtype=object)[rng.integers(0, max_days, size)]
+    
+    def _present_categories(self, col: pd.Series) -> List[str]:
+        """Get the distinct values of a column in sorted order"""
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            return sorted(col.cat.remove_unused_categories().cat.categories.tolist())
+        return sorted(col.unique().tolist())
+    
+    def _fetch_csv_data(self, data_source: DataSource, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Fetch data from CSV files in the data directory
+        Fetch data from a registered CSV source
         
         Args:
-            project: Project name (e.g., 'kansas-city-crashes')
-            data_type: Type of data (e.g., 'crashes', 'intersections', 'gps')
+            data_source: Registered CSV source (e.g., kansas-city-crashes/intersections)
             params: Optional parameters for data processing
             
         Returns:
             Dictionary containing the CSV data and metadata
         """
+        project, data_type = data_source.project, data_source.data_type
         try:
-            # Look for CSV files in the project's raw data directory
-            raw_dir = f"data/projects/{project}/raw"
-            if not os.path.exists(raw_dir):
-                raise FileNotFoundError(f"Raw data directory not found: {raw_dir}")
-            
-            # Find CSV files matching the data type pattern
-            csv_files = []
-            for file in os.listdir(raw_dir):
-                if file.endswith('.csv') and data_type in file.lower():
-                    csv_files.append(os.path.join(raw_dir, file))
+            df, files = self._load_csv_frame(data_source)
             
-            # Handle specific file name mappings for Kansas City data
-            if not csv_files and project == "kansas-city-crashes":
-                if data_type == "crashes":
-                    crash_file = os.path.join(raw_dir, "combined_crash_data.csv")
-                    if os.path.exists(crash_file):
-                        csv_files = [crash_file]
-                elif data_type == "intersections":
-                    intersection_file = os.path.join(raw_dir, "all_intersections.csv")
-                    if os.path.exists(intersection_file):
-                        csv_files = [intersection_file]
+            # Filter, project and slice before any records are materialized
+            with timed('query'):
+                df, matched_records = self._apply_query(df, params)
             
-            if not csv_files:
-                # If no specific files found, look for sample files
-                sample_file = f"sample_{data_type}.csv"
-                sample_path = os.path.join(raw_dir, sample_file)
-                if os.path.exists(sample_path):
-                    csv_files = [sample_path]
-                else:
-                    raise FileNotFoundError(f"No CSV files found for {data_type} in {raw_dir}")
-            
-            # Read the first matching CSV file
-            csv_path = csv_files[0]
-            df = pd.read_csv(csv_path)
-            
-            # Clean column names (remove extra spaces and unnamed columns)
-            df.columns = df.columns.str.strip()
-            df = df.drop(columns=[col for col in df.columns if 'Unnamed' in col])
-            
-            # Convert DataFrame to list of dictionaries
-            data = df.to_dict('records')
-            
-            # Convert pandas data types to JSON-serializable formats
-            for record in data:
-                for key, value in record.items():
-                    # Convert pandas Int64 to regular int
-                    if hasattr(value, 'item'):
-                        record[key] = value.item()
-                    # Convert numpy types to Python types
-                    elif hasattr(value, 'dtype'):
-                        if value.dtype.kind in 'iuf':  # integer, unsigned, float
-                            record[key] = value.item()
-                        else:
-                            record[key] = str(value)
-                    # Handle None values and NaN
-                    elif value is None or (hasattr(value, '__float__') and str(value) == 'nan'):
-                        record[key] = None
-                    # Handle NaN values from pandas
-                    elif str(value).lower() == 'nan':
-                        record[key] = None
-            
-            # Add IDs if not present
-            for i, record in enumerate(data):
-                if 'id' not in record:
-                    record['id'] = i
-            
-            # Apply any filtering based on params
-            if params and 'limit' in params:
-                data = data[:params['limit']]
+            # Convert DataFrame to JSON-serializable records (NaN -> None, numpy -> native, ids added)
+            with timed('records', 'record cleanup'):
+                data = self._frame_to_records(df)
             
             return {
                 'data': data,
-                'metadata': {
-                    'source': f"{project}_{data_type}",
-                    'file_path': csv_path,
-                    'total_records': len(data),
-                    'columns': list(df.columns),
-                    'data_types': {col: str(dtype) for col, dtype in df.dtypes.to_dict().items()}
-                }
+                'metadata': self._csv_metadata(data_source, df, files, matched_records)
             }
             
         except Exception as e:
             logger.error(f"Error fetching CSV data for {project}/{data_type}: {str(e)}")
             return {"error": str(e), "source": f"{project}_{data_type}"}
     
+    def _csv_metadata(self, data_source: DataSource, df: pd.DataFrame, files: List[Dict[str, Any]],
+                      matched_records: int) -> Dict[str, Any]:
+        """Describe the queried frame of a CSV source"""
+        return {
+            'source': f"{data_source.project}_{data_source.data_type}",
+            'file_path': files[0]['file_path'],
+            'files': files,
+            'total_records': len(df),
+            'matched_records': matched_records,
+            'columns': list(df.columns),
+            'data_types': {col: str(dtype) for col, dtype in df.dtypes.to_dict().items()},
+            'memory': self._memory_report(files)
+        }
+    
+    def fetch_frame_format(self, source: str, format_type: str,
+                           params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Fetch a source in one of the FRAME_FORMATS
+        
+        CSV sources are queried and formatted straight from their cached frame, skipping the
+        records fetch_data would build; other sources go through fetch_data and process_data.
+        
+        Args:
+            source: Data source identifier
+            format_type: One of FRAME_FORMATS
+            params: Query and format parameters, as for fetch_data and process_data
+            
+        Returns:
+            The formatted result, as process_data returns it
+        """
+        data_source = self._csv_source(source)
+        if data_source is None:
+            return self.process_data(self.fetch_data(source, params), format_type, params)
+        
+        try:
+            with timed('fetch', source):
+                df, files = self._load_csv_frame(data_source)
+                with timed('query'):
+                    df, matched_records = self._apply_query(df, params)
+        except Exception as e:
+            logger.error(f"Error fetching data from {source}: {str(e)}")
+            return {"error": str(e), "source": source}
+        
+        metadata = self._csv_metadata(data_source, df, files, matched_records)
+        try:
+            with timed('process', format_type):
+                if format_type == '3d_scatter_bin':
+                    return self._point_cloud(df, metadata)
+                elif format_type == 'geo_heatmap':
+                    return self._geo_heatmap(df, metadata, params)
+                raise ValueError(f"Format {format_type} cannot be built from a frame")
+        except Exception as e:
+            logger.error(f"Error processing data: {str(e)}")
+            return {"error": str(e), "format_type": format_type}
+    
+    def _load_csv_frame(self, data_source: DataSource) -> tuple:
+        """
+        Load the DataFrame for a registered CSV source
+        
+        Every resolved file is loaded (parsed once and compacted by the source's schema, then
+        served from the columnar cache) and the frames are concatenated in file order, so row
+        ids run on across files. Files not yet in the cache are parsed in a long-lived pool
+        of worker processes, one file per core.
+        
+        Returns:
+            Tuple of (DataFrame, list of {'file_path', 'rows', 'memory'} for the contributing files)
+        """
+        schema = data_source.schema
+        with timed('load', 'CSV parse or columnar cache read'):
+            csv_files = self.registry.files(data_source.source_id)
+            if len(csv_files) == 1:
+                loaded = [self.columnar_cache.update(csv_files[0], self._parse_csv, schema)]
+            else:
+                uncached = [path for path in csv_files
+                            if not os.path.exists(self.columnar_cache.entry_path(path, schema=schema))]
+                workers = min(len(uncached), CSV_LOAD_WORKERS)
+                if workers > 1:
+                    start = time.perf_counter()
+                    list(self._get_parse_pool().map(_cache_csv_file, [self.cache_dir] * len(uncached), uncached,
+                                                    [schema] * len(uncached)))
+                    logger.info(f"Parsed {len(uncached)} files of {data_source.source_id} with {workers} workers "
+                                f"in {time.perf_counter() - start:.2f}s")
+            
+                # Reading cached entries is mostly I/O, so threads are enough here
+                with ThreadPoolExecutor(max_workers=min(len(csv_files), CSV_LOAD_WORKERS)) as pool:
+                    loaded = list(pool.map(lambda path: self.columnar_cache.update(path, self._parse_csv, schema),
+                                           csv_files))
+        
+        frames = [frame for frame, _ in loaded]
+        files = [{'file_path': path, 'rows': len(frame), 'memory': manifest.get('memory')}
+                 for path, (frame, manifest) in zip(csv_files, loaded)]
+        # Categories differ between files, so align them first to keep the columns categorical
+        df = frames[0] if len(frames) == 1 else pd.concat(unify_categories(frames), ignore_index=True)
+        return df, files
+    
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        """Get the CSV parse pool, starting its workers on first use"""
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                context = multiprocessing.get_context(CSV_PARSE_START_METHOD)
+                self._parse_pool = ProcessPoolExecutor(max_workers=CSV_LOAD_WORKERS, mp_context=context)
+            return self._parse_pool
+    
+    def _memory_report(self, files: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Sum the memory the schema saved across a source's files, or None if it was not recorded"""
+        memory = [f['memory'] for f in files if f.get('memory')]
+        if len(memory) != len(files):
+            return None
+        parsed_bytes = sum(m['parsed_bytes'] for m in memory)
+        compact_bytes = sum(m['compact_bytes'] for m in memory)
+        return {
+            'parsed_bytes': parsed_bytes,
+            'compact_bytes': compact_bytes,
+            'saved_bytes': parsed_bytes - compact_bytes,
+            'saved_ratio': round(1 - compact_bytes / parsed_bytes, 4) if parsed_bytes else 0.0
+        }
+    
+    @staticmethod
+    def _parse_csv(csv_path: Union[str, io.BytesIO]) -> pd.DataFrame:
+        """Parse a raw CSV file (or a buffer of CSV text) and clean its columns"""
+        return DataProcessor._clean_columns(pd.read_csv(csv_path))
+    
+    @staticmethod
+    def _clean_columns(df: pd.DataFrame) -> pd.DataFrame:
+        """Clean column names (remove extra spaces and unnamed columns)"""
+        df.columns = df.columns.str.strip()
+        return df.drop(columns=[col for col in df.columns if 'Unnamed' in col])
+    
+    def _apply_query(self, df: pd.DataFrame, params: Optional[Dict[str, Any]] = None) -> tuple:
+        """
+        Apply query params to a DataFrame before it is converted to records
+        
+        Supported params:
+            where: Predicates as [column, op, value] lists or strings like "CrashCount >= 100"
+            bbox: [min_lat, min_lng, max_lat, max_lng] on the coordinate columns
+            columns: Columns to return
+            offset: Number of matching rows to skip
+            limit: Maximum number of rows to return
+            
+        Returns:
+            Tuple of (filtered DataFrame, number of rows matching the predicates)
+        """
+        params = params or {}
+        mask = None
+        
+        where = params.get('where', [])
+        if isinstance(where, (str, dict)) or self._is_predicate_list(where):
+            where = [where]
+        for predicate in where:
+            column, op, value = self._parse_predicate(predicate)
+            if column not in df.columns:
+                raise ValueError(f"Unknown column in predicate: {column}")
+            if op not in QUERY_OPERATORS:
+                raise ValueError(f"Unsupported operator in predicate: {op}")
+            col = df[column]
+            if isinstance(col.dtype, pd.CategoricalDtype) and op not in ('==', '!=', 'in'):
+                # Categoricals are unordered; compare their values like the plain strings they replace
+                col = col.astype(col.cat.categories.dtype)
+            condition = QUERY_OPERATORS[op](col, value)
+            mask = condition if mask is None else mask & condition
+        
+        if 'bbox' in params:
+            min_lat, min_lng, max_lat, max_lng = [float(v) for v in params['bbox']]
+            lat_col = self._find_column(df, LATITUDE_COLUMNS)
+            lng_col = self._find_column(df, LONGITUDE_COLUMNS)
+            if lat_col is None or lng_col is None:
+                raise ValueError("bbox requires latitude and longitude columns")
+            condition = df[lat_col].between(min_lat, max_lat) & df[lng_col].between(min_lng, max_lng)
+            mask = condition if mask is None else mask & condition
+        
+        # The index keeps each row's position in the source file, which becomes its id
+        if mask is not None:
+            df = df[mask.fillna(False).astype(bool)]
+        matched_records = len(df)
+        
+        if 'columns' in params:
+            unknown = [col for col in params['columns'] if col not in df.columns]
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+            df = df[list(params['columns'])]
+        
+        offset = int(params.get('offset', 0))
+        if offset:
+            df = df.iloc[offset:]
+        if params.get('limit') is not None:
+            df = df.iloc[:int(params['limit'])]
+        
+        return df, matched_records
+    
+    def _is_predicate_list(self, value: Any) -> bool:
+        """Check whether a list is one [column, op, value] predicate rather than a list of predicates"""
+        return (isinstance(value, list) and len(value) == 3 and isinstance(value[0], str)
+                and isinstance(value[1], str) and value[1] in QUERY_OPERATORS)
+    
+    def _parse_predicate(self, predicate: Union[str, list, dict]) -> tuple:
+        """Parse a predicate given as a string, [column, op, value] list or dict"""
+        if isinstance(predicate, dict):
+            return predicate.get('column'), predicate.get('op', '=='), predicate.get('value')
+        if isinstance(predicate, list) and len(predicate) == 3:
+            return tuple(predicate)
+        if isinstance(predicate, str):
+            match = PREDICATE_PATTERN.match(predicate)
+            if match:
+                column, op, value = match.groups()
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    # Unquoted strings are compared as-is
+                    pass
+                return column, op, value
+        raise ValueError(f"Invalid predicate: {predicate}")
+    
+    def _find_column(self, df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
+        """Find the first column whose name matches one of the candidates, ignoring case"""
+        by_name = {str(col).lower(): col for col in df.columns}
+        for candidate in candidates:
+            if candidate in by_name:
+                return by_name[candidate]
+        return None
+    
+    def _frame_to_records(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Convert a DataFrame to JSON-serializable records, column by column
+        
+        Missing values and strings spelled 'nan' (any case) become None, numpy scalars
+        become native Python values and an 'id' column holding the row's index (its
+        position in the source file) is appended when the data has none.
+        """
+        names = list(df.columns)
+        columns = []
+        for name, col in df.items():
+            missing = col.isna()
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                # Check each category once instead of every row
+                categories = col.cat.categories
+                nan_like = [c for c in categories if str(c).lower() == 'nan']
+                if nan_like:
+                    missing |= col.isin(nan_like)
+            elif pd.api.types.is_object_dtype(col):
+                missing |= col.astype(str).str.lower().eq('nan')
+            elif pd.api.types.is_string_dtype(col):
+                missing |= col.str.lower().eq('nan').fillna(False).astype(bool)
+            
+            # tolist() yields native Python values; only columns with gaps need the object pass
+            if missing.any():
+                columns.append(col.astype(object).where(~missing, None).tolist())
+            else:
+                columns.append(col.tolist())
+        
+        if 'id' not in names:
+            names.append('id')
+            columns.append(df.index.tolist())
+        return [dict(zip(names, row)) for row in zip(*columns)]
+    
     def _format_3d_scatter(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Format data for 3D scatter plot visualization"""
         data = raw_data.get('data', [])
@@ -379,14 +1138,152 @@ class DataProcessor:
             'type': '3d_scatter',
             'data': formatted_data,
             'metadata': metadata,
-            'visualization_config': {
-                'x_label': 'Longitude/Month/Funding',
-                'y_label': 'Latitude/Amount/Enrollment',
-                'z_label': 'Severity/Size/Turnout',
-                'color_scale': 'viridis',
-                'size_range': [0.1, 2.0]
-            }
+            'visualization_config': dict(SCATTER_VISUALIZATION_CONFIG)
+        }
+    
+    def _format_3d_scatter_bin(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Format fetched records as a binary point cloud (see _point_cloud)"""
+        data = raw_data.get('data', [])
+        if not data:
+            return {"error": "No data to format"}
+        return self._point_cloud(pd.DataFrame.from_records(data), raw_data.get('metadata', {}))
+    
+    def _point_cloud(self, df: pd.DataFrame, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Format a frame as a binary point cloud for direct upload into typed arrays
+        
+        The points are the ones _format_3d_scatter builds from the frame's records, but every
+        array is computed column-wise without building a dict per point.
+        
+        The buffer starts with the magic bytes 'SPC1' and a little-endian uint32 header
+        length, followed by a JSON header describing where each array starts. Positions
+        are float32 xyz triples relative to the header's float64 origin, sizes are float32,
+        colors are uint8 RGB triples and labels are indices into the header's label list.
+        """
+        count = len(df)
+        if not count:
+            return {"error": "No data to format"}
+        
+        coords = np.column_stack([self._scatter_numbers(df, axis) for axis in ('x', 'y', 'z')])
+        origin = np.nan_to_num(np.nanmin(coords, axis=0))
+        positions = (coords - origin).astype('<f4')
+        sizes = np.minimum(np.maximum(self._scatter_numbers(df, 'size') / 1000, 0.1), 2.0).astype('<f4')
+        
+        # Pick each point's palette entry from its type, then look up the RGB triples at once
+        palette = [color for _, color in ITEM_TYPE_COLORS] + [DEFAULT_ITEM_COLOR]
+        rgb = np.array([[int(color[k:k + 2], 16) for k in (1, 3, 5)] for color in palette], dtype=np.uint8)
+        choice = np.full(count, len(ITEM_TYPE_COLORS))
+        if 'type' in df.columns:
+            types = df['type'].astype(str)
+            for i in reversed(range(len(ITEM_TYPE_COLORS))):
+                choice[types.str.contains(ITEM_TYPE_COLORS[i][0], regex=False).to_numpy(dtype=bool)] = i
+        colors = rgb[choice]
+        
+        # Labels are named as str() of their record value, so only the distinct values are converted
+        label_col = self._scatter_column(df, 'label')
+        if label_col is None:
+            labels, label_indices = np.array(['']), np.zeros(count, dtype=np.intp)
+        else:
+            codes, uniques = pd.factorize(label_col, use_na_sentinel=False)
+            names = [str(self._record_value(value)) for value in np.asarray(uniques, dtype=object).tolist()]
+            labels, inverse = np.unique(np.array(names, dtype=object), return_inverse=True)
+            label_indices = inverse[codes]
+        label_indices = label_indices.astype('<u2' if len(labels) <= 0xFFFF else '<u4')
+        
+        arrays = [('positions', positions, 3), ('sizes', sizes, 1), ('colors', colors, 3),
+                  ('label_indices', label_indices, 1)]
+        
+        # Integer ids get their own array; anything else travels in the header
+        ids = df['id'] if 'id' in df.columns else pd.Series(df.index, index=df.index)
+        numeric_ids = (pd.api.types.is_integer_dtype(ids) and not pd.api.types.is_bool_dtype(ids)
+                       and ids.min() >= 0 and ids.max() <= 0xFFFFFFFF)
+        if numeric_ids:
+            arrays.append(('ids', ids.to_numpy(dtype='<u4'), 1))
+        
+        header = {
+            'version': POINT_CLOUD_VERSION,
+            'count': count,
+            'byte_order': 'little',
+            'origin': origin.tolist(),
+            'labels': labels.tolist(),
+            'buffers': {},
+            'metadata': metadata,
+            'visualization_config': dict(SCATTER_VISUALIZATION_CONFIG)
         }
+        if not numeric_ids:
+            header['ids'] = [self._record_value(value) for value in ids.astype(object).tolist()]
+        
+        # Offsets depend on the header length, so lay out the arrays once the header size is stable
+        header_bytes = b''
+        while True:
+            offset = 8 + len(header_bytes)
+            for name, array, components in arrays:
+                header['buffers'][name] = {
+                    'offset': offset,
+                    'type': self._typed_array_name(array.dtype),
+                    'components': components,
+                    'length': int(array.size)
+                }
+                offset += self._align4(array.nbytes)
+            encoded = json.dumps(header, default=str).encode('utf-8')
+            encoded += b' ' * (self._align4(len(encoded)) - len(encoded))
+            done = len(encoded) == len(header_bytes)
+            header_bytes = encoded
+            if done:
+                break
+        
+        parts = [POINT_CLOUD_MAGIC, struct.pack('<I', len(header_bytes)), header_bytes]
+        for _, array, _ in arrays:
+            data = array.tobytes()
+            parts.append(data + b'\0' * (self._align4(len(data)) - len(data)))
+        
+        return {
+            'type': '3d_scatter_bin',
+            'content_type': 'application/octet-stream',
+            'buffer': b''.join(parts),
+            'header': header
+        }
+    
+    def _numeric_column(self, df: pd.DataFrame, name: str) -> np.ndarray:
+        """Get a column as float64 with anything that is not a number as NaN; ids come from the index"""
+        if name not in df.columns:
+            if name == 'id':
+                return df.index.to_numpy(dtype=np.float64)
+            return np.full(len(df), np.nan)
+        col = df[name]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            col = col.astype(object)
+        return pd.to_numeric(col, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    def _scatter_column(self, df: pd.DataFrame, attribute: str) -> Optional[pd.Series]:
+        """Get the column a 3D scatter attribute is read from, or None if it takes its default"""
+        names, _ = SCATTER_FIELDS[attribute]
+        return next((df[name] for name in names if name in df.columns), None)
+    
+    def _scatter_numbers(self, df: pd.DataFrame, attribute: str) -> np.ndarray:
+        """Get a numeric 3D scatter attribute as float64, with missing values as NaN"""
+        col = self._scatter_column(df, attribute)
+        if col is None:
+            return np.full(len(df), float(SCATTER_FIELDS[attribute][1]))
+        if isinstance(col.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(col):
+            col = col.astype(object).map(self._record_value)
+        return col.to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    def _record_value(self, value: Any) -> Any:
+        """Get the value _frame_to_records gives a cell (missing values and 'nan' strings become None)"""
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return None
+        if isinstance(value, str) and value.lower() == 'nan':
+            return None
+        return value.item() if isinstance(value, np.generic) else value
+    
+    def _typed_array_name(self, dtype: np.dtype) -> str:
+        """Get the JavaScript typed array element type for a numpy dtype"""
+        return {'f': 'float', 'u': 'uint', 'i': 'int'}[dtype.kind] + str(dtype.itemsize * 8)
+    
+    def _align4(self, length: int) -> int:
+        """Round a byte length up to the next multiple of 4"""
+        return (length + 3) & ~3
     
     def _format_heatmap(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Format data for heatmap visualization"""
@@ -426,6 +1323,125 @@ class DataProcessor:
             }
         }
     
+    def _format_geo_heatmap(self, raw_data: Dict[str, Any], params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Format data as a geographic heatmap by binning latitude/longitude into a grid
+        
+        Supported params:
+            grid: Cells per side, or [rows, cols] (default GEO_HEATMAP_GRID_SIZE, at most GEO_HEATMAP_MAX_GRID_SIZE)
+            bounds: [min_lat, min_lng, max_lat, max_lng]; defaults to the data's extent
+            weight: Column whose values are aggregated (e.g. 'CrashCount')
+            agg: 'count', 'sum', 'mean' or 'max' (default 'sum' with a weight, else 'count')
+            sparse: Return only non-empty cells instead of a dense grid
+        """
+        data = raw_data.get('data', [])
+        if not data:
+            return {"error": "No data to format"}
+        return self._geo_heatmap(pd.DataFrame.from_records(data), raw_data.get('metadata', {}), params)
+    
+    def _geo_heatmap(self, df: pd.DataFrame, metadata: Dict[str, Any],
+                     params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Bin a frame's coordinates into a geographic heatmap (see _format_geo_heatmap)"""
+        params = params or {}
+        if df.empty:
+            return {"error": "No data to format"}
+        
+        weight_col = params.get('weight')
+        agg = params.get('agg', 'sum' if weight_col else 'count')
+        if agg not in GEO_HEATMAP_AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation: {agg}")
+        if agg != 'count' and not weight_col:
+            raise ValueError(f"Aggregation '{agg}' requires a weight column")
+        
+        grid = params.get('grid', GEO_HEATMAP_GRID_SIZE)
+        rows, cols = (int(grid[0]), int(grid[1])) if isinstance(grid, list) else (int(grid), int(grid))
+        if rows < 1 or cols < 1:
+            raise ValueError("Grid dimensions must be positive")
+        if rows > GEO_HEATMAP_MAX_GRID_SIZE or cols > GEO_HEATMAP_MAX_GRID_SIZE:
+            raise ValueError(f"Grid dimensions must be at most {GEO_HEATMAP_MAX_GRID_SIZE}")
+        
+        # Pull the needed columns out once, then bin everything with numpy
+        lat_col = self._find_column(df, LATITUDE_COLUMNS)
+        lng_col = self._find_column(df, LONGITUDE_COLUMNS)
+        if lat_col is None or lng_col is None:
+            raise ValueError("geo_heatmap requires latitude and longitude fields")
+        lats = self._numeric_column(df, lat_col)
+        lngs = self._numeric_column(df, lng_col)
+        weights = self._numeric_column(df, weight_col) if weight_col else None
+        
+        valid = np.isfinite(lats) & np.isfinite(lngs)
+        if weights is not None:
+            valid &= np.isfinite(weights)
+        if 'bounds' in params:
+            min_lat, min_lng, max_lat, max_lng = [float(v) for v in params['bounds']]
+            valid &= (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
+        elif valid.any():
+            min_lat, max_lat = float(lats[valid].min()), float(lats[valid].max())
+            min_lng, max_lng = float(lngs[valid].min()), float(lngs[valid].max())
+        else:
+            raise ValueError("No valid coordinates to bin")
+        
+        lat_step = max(max_lat - min_lat, 1e-9) / rows
+        lng_step = max(max_lng - min_lng, 1e-9) / cols
+        row_idx = np.clip(((lats[valid] - min_lat) / lat_step).astype(np.int64), 0, rows - 1)
+        col_idx = np.clip(((lngs[valid] - min_lng) / lng_step).astype(np.int64), 0, cols - 1)
+        cells = row_idx * cols + col_idx
+        
+        counts = np.bincount(cells, minlength=rows * cols)
+        if agg == 'count':
+            values = counts.astype(np.float64)
+        elif agg == 'max':
+            values = np.full(rows * cols, -np.inf)
+            np.maximum.at(values, cells, weights[valid])
+        else:
+            values = np.bincount(cells, weights=weights[valid], minlength=rows * cols)
+            if agg == 'mean':
+                values = np.divide(values, counts, out=np.zeros_like(values), where=counts > 0)
+        
+        # Cells without points have no mean or max
+        values = np.where(counts > 0, values, 0.0 if agg in ('count', 'sum') else np.nan)
+        occupied = values[counts > 0]
+        value_range = [float(occupied.min()), float(occupied.max())] if occupied.size else [0.0, 0.0]
+        
+        heatmap_data = {
+            'rows': rows,
+            'cols': cols,
+            'bounds': [min_lat, min_lng, max_lat, max_lng],
+            'cell_size': [lat_step, lng_step],
+            'aggregation': agg,
+            'weight': weight_col,
+            'total_points': int(valid.sum())
+        }
+        if params.get('sparse'):
+            nonzero = np.flatnonzero(counts)
+            heatmap_data['cells'] = [
+                {
+                    'row': int(cell // cols),
+                    'col': int(cell % cols),
+                    'lat': min_lat + (cell // cols + 0.5) * lat_step,
+                    'lng': min_lng + (cell % cols + 0.5) * lng_step,
+                    'value': float(values[cell]),
+                    'count': int(counts[cell])
+                }
+                for cell in nonzero
+            ]
+        else:
+            # Row 0 is the southernmost row; empty mean/max cells are null
+            grid_values = values.reshape(rows, cols).astype(object)
+            grid_values[np.isnan(values.reshape(rows, cols))] = None
+            heatmap_data['values'] = grid_values.tolist()
+            heatmap_data['counts'] = counts.reshape(rows, cols).tolist()
+        
+        return {
+            'type': 'geo_heatmap',
+            'data': heatmap_data,
+            'metadata': metadata,
+            'visualization_config': {
+                'color_scale': 'plasma',
+                'value_range': value_range
+            }
+        }
+    
     def _format_timeline(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Format data for timeline visualization"""
         data = raw_data.get('data', [])
@@ -462,41 +1478,189 @@ class DataProcessor:
             }
         }
     
-    def _format_network(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Format data for network visualization"""
+    def _format_timeline_summary(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Format data as per-period aggregates without embedding the items
+        
+        Each bucket reports count, sum, min, max and percentiles of the timeline value.
+        Bucket contents are paged through get_timeline_items instead.
+        """
         data = raw_data.get('data', [])
         metadata = raw_data.get('metadata', {})
         
         if not data:
             return {"error": "No data to format"}
         
-        # Create nodes and edges for network
-        nodes = []
-        edges = []
-        node_ids = set()
+        timeline = self._timeline_frame(data)
+        grouped = timeline.groupby('time_period', sort=True)['value']
+        stats = grouped.agg(['count', 'sum', 'min', 'max'])
+        percentiles = grouped.quantile(TIMELINE_PERCENTILES).unstack()
+        
+        formatted_data = []
+        for time_period, row in stats.iterrows():
+            formatted_data.append({
+                'time_period': time_period,
+                'count': int(row['count']),
+                'total_value': float(row['sum']),
+                'min_value': self._optional_float(row['min']),
+                'max_value': self._optional_float(row['max']),
+                'percentiles': {
+                    f"p{int(q * 100)}": self._optional_float(percentiles.at[time_period, q])
+                    for q in TIMELINE_PERCENTILES
+                }
+            })
+        
+        return {
+            'type': 'timeline_summary',
+            'data': formatted_data,
+            'metadata': metadata,
+            'visualization_config': {
+                'time_format': 'YYYY-MM',
+                'value_scale': 'linear',
+                'items_page_size': TIMELINE_ITEMS_PAGE_SIZE
+            }
+        }
+    
+    def get_timeline_items(self, source: str, period: str, params: Optional[Dict[str, Any]] = None,
+                           page: int = 1, page_size: int = TIMELINE_ITEMS_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Get one page of the items in a timeline bucket
         
+        Args:
+            source: Data source identifier
+            period: Time period as reported by the timeline formats (e.g. '2024-05')
+            params: Parameters for data fetching
+            page: 1-based page number
+            page_size: Items per page
+            
+        Returns:
+            Dictionary containing the page of items and paging metadata
+        """
+        try:
+            if page < 1 or page_size < 1:
+                raise ValueError("page and page_size must be positive")
+            
+            # Bucket membership is computed once per source version and params
+            cache_key = ('timeline_buckets', source, canonical_params(params))
+            version = self.get_source_version(source)
+            found, buckets = self.timeline_bucket_cache.get(cache_key, version)
+            if not found:
+                raw_data = self.fetch_data(source, params)
+                if 'error' in raw_data:
+                    return raw_data
+                data = raw_data.get('data', [])
+                periods = self._timeline_frame(data)['time_period'].astype(str) if data else pd.Series(dtype=str)
+                positions = pd.Series(np.arange(len(periods))).groupby(periods.to_numpy()).indices
+                buckets = {'data': data, 'positions': positions}
+                if version is not None:
+                    self.timeline_bucket_cache.put(cache_key, version, buckets)
+            
+            positions = buckets['positions'].get(period, [])
+            start = (page - 1) * page_size
+            items = [buckets['data'][i] for i in positions[start:start + page_size]]
+            
+            return {
+                'time_period': period,
+                'items': items,
+                'page': page,
+                'page_size': page_size,
+                'total_items': len(positions),
+                'total_pages': (len(positions) + page_size - 1) // page_size
+            }
+        except Exception as e:
+            logger.error(f"Error fetching timeline items for {source}/{period}: {str(e)}")
+            return {"error": str(e), "source": source}
+    
+    def _timeline_frame(self, data: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Compute the time period and timeline value of every record column-wise
+        
+        Mirrors _get_time_key and _get_timeline_value: the period is the timestamp's
+        YYYY-MM prefix, falling back to the month field, and the value is the first of
+        severity, funding_amount and enrollment.
+        """
+        df = pd.DataFrame(data)
+        n = len(df)
+        
+        fallback = df['month'] if 'month' in df.columns else pd.Series(['Unknown'] * n, dtype=object)
+        if 'timestamp' in df.columns:
+            timestamps = df['timestamp']
+            has_timestamp = timestamps.notna() & (timestamps.astype(str) != '')
+            periods = timestamps.astype(str).str[:7].astype(object).where(has_timestamp, fallback.astype(object))
+        else:
+            periods = fallback
+        
+        value_col = next((col for col in ['severity', 'funding_amount', 'enrollment'] if col in df.columns), None)
+        values = pd.to_numeric(df[value_col], errors='coerce') if value_col else pd.Series(np.zeros(n))
+        return pd.DataFrame({'time_period': periods.to_numpy(), 'value': values.to_numpy(dtype=np.float64)})
+    
+    def _optional_float(self, value: Any) -> Optional[float]:
+        """Convert a numeric value to float, mapping NaN to None"""
+        return None if pd.isna(value) else float(value)
+    
+    def _format_network(self, raw_data: Dict[str, Any], params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Format data for network visualization
+        
+        Edges are aggregated into unique (source, target) pairs whose weight is the number
+        of records linking them. Node size is the number of records mentioning the node
+        and degree its number of distinct neighbours.
+        
+        Supported params:
+            min_weight: Drop edges with a smaller weight
+            top_edges: Keep only the heaviest edges
+        """
+        data = raw_data.get('data', [])
+        metadata = raw_data.get('metadata', {})
+        params = params or {}
+        
+        if not data:
+            return {"error": "No data to format"}
+        
+        # Query string params arrive as text
+        try:
+            min_weight = int(params.get('min_weight', 0))
+            top_edges = int(params['top_edges']) if params.get('top_edges') is not None else None
+        except (TypeError, ValueError):
+            raise ValueError("min_weight and top_edges must be integers")
+        
+        # Count node occurrences and edge pairs in a single pass
+        node_counts = {}
+        edge_weights = {}
         for item in data:
-            # Create nodes based on categories
             categories = self._get_network_categories(item)
             for category in categories:
-                if category not in node_ids:
-                    nodes.append({
-                        'id': category,
-                        'label': category,
-                        'size': 1,
-                        'color': self._get_color_for_category(category)
-                    })
-                    node_ids.add(category)
+                node_counts[category] = node_counts.get(category, 0) + 1
             
-            # Create edges between related categories
-            if len(categories) > 1:
-                for i in range(len(categories)):
-                    for j in range(i + 1, len(categories)):
-                        edges.append({
-                            'source': categories[i],
-                            'target': categories[j],
-                            'weight': 1
-                        })
+            # Link every pair of related categories
+            for i in range(len(categories)):
+                for j in range(i + 1, len(categories)):
+                    pair = (categories[i], categories[j])
+                    edge_weights[pair] = edge_weights.get(pair, 0) + 1
+        
+        neighbours = {category: set() for category in node_counts}
+        for source, target in edge_weights:
+            neighbours[source].add(target)
+            neighbours[target].add(source)
+        
+        nodes = [
+            {
+                'id': category,
+                'label': category,
+                'size': count,
+                'degree': len(neighbours[category]),
+                'color': self._get_color_for_category(category)
+            }
+            for category, count in node_counts.items()
+        ]
+
+        edges = [
+            {'source': source, 'target': target, 'weight': weight}
+            for (source, target), weight in edge_weights.items()
+            if weight >= min_weight
+        ]
+        if top_edges is not None:
+            edges = sorted(edges, key=lambda edge: edge['weight'], reverse=True)[:top_edges]
         
         return {
             'type': 'network',
@@ -507,25 +1671,19 @@ class DataProcessor:
             'metadata': metadata,
             'visualization_config': {
                 'node_size_range': [0.5, 3.0],
-                'edge_width_range': [0.1, 2.0]
+                'edge_width_range': [0.1, 2.0],
+                'total_edges': len(edge_weights),
+                'returned_edges': len(edges)
             }
         }
     
     def _get_color_for_item(self, item: Dict[str, Any]) -> str:
         """Get color for a data item based on its type"""
         item_type = item.get('type', '')
-        if 'Theft' in item_type:
-            return '#ff6b6b'
-        elif 'Assault' in item_type:
-            return '#ff8e53'
-        elif 'Education' in item_type:
-            return '#4ecdc4'
-        elif 'Health' in item_type:
-            return '#45b7d1'
-        elif 'Defense' in item_type:
-            return '#96ceb4'
-        else:
-            return '#f7f1e3'
+        for keyword, color in ITEM_TYPE_COLORS:
+            if keyword in item_type:
+                return color
+        return DEFAULT_ITEM_COLOR
     
     def _get_size_for_item(self, item: Dict[str, Any]) -> float:
         """Get size for a data item based on its value"""
@@ -539,7 +1697,8 @@ class DataProcessor:
     def _get_color_for_category(self, category: str) -> str:
         """Get color for a category"""
         colors = ['#ff6b6b', '#4ecdc4', '#45b7d1', '#96ceb4', '#f7f1e3', '#ff8e53']
-        return colors[hash(category) % len(colors)]
+        # crc32 rather than hash(), which is randomized per process and would recolor nodes on restart
+        return colors[zlib.crc32(str(category).encode('utf-8')) % len(colors)]
     
     def _get_heatmap_value(self, item: Dict[str, Any]) -> float:
         """Get value for heatmap visualization"""
@@ -569,10 +1728,15 @@ class DataProcessor:
             categories.append(item['district'])
         return categories
 
+def _cache_csv_file(cache_dir: str, csv_path: str, schema: Optional[FrameSchema] = None):
+    """Parse a CSV file into the columnar cache (runs in a worker process)"""
+    ColumnarCache(cache_dir).update(csv_path, DataProcessor._parse_csv, schema)
+
 # Global data processor instance
 data_processor = DataProcessor()
 
-def get_processed_data(source: str, format_type: str = "3d_scatter", params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def get_processed_data(source: str, format_type: str = "3d_scatter", params: Optional[Dict[str, Any]] = None,
+                       stored: Optional[Callable[[str, str, Dict[str, Any]], Optional[Dict[str, Any]]]] = None) -> Dict[str, Any]:
     """
     Convenience function to fetch and process data in one call
     
@@ -580,9 +1744,111 @@ def get_processed_data(source: str, format_type: str = "3d_scatter", params: Opt
         source: Data source identifier
         format_type: Type of visualization format
         params: Parameters for data fetching
+        stored: Optional lookup of results kept on disk (e.g. job_manager.stored_result),
+            tried before computing a result missing from the result cache
         
     Returns:
         Processed data ready for 3D visualization
+        
+    Raises:
+        TimeoutError: When an identical request in progress did not finish within
+            SINGLE_FLIGHT_TIMEOUT_SECONDS
+    """
+    # Serve repeated requests from the result cache while the source data is unchanged
+    cache_key = (source, format_type, canonical_params(params))
+    version = data_processor.get_source_version(source)
+    with timed('cache'):
+        found, cached = data_processor.result_cache.get(cache_key, version)
+    if found:
+        return cached
+    
+    def compute() -> Dict[str, Any]:
+        result = stored(source, format_type, params or {}) if stored else None
+        if result is None and format_type in FRAME_FORMATS:
+            result = data_processor.fetch_frame_format(source, format_type, params)
+        elif result is None:
+            raw_data = data_processor.fetch_data(source, params)
+            result = data_processor.process_data(raw_data, format_type, params)
+        
+        # Errors are never cached so a fixed data file is picked up on the next request
+        if 'error' not in result and version is not None:
+            data_processor.result_cache.put(cache_key, version, result)
+        return result
+    
+    # Identical concurrent requests wait for the first one instead of each parsing the source
+    start = time.perf_counter()
+    result, shared = data_processor.single_flight.do(cache_key + (version,), compute)
+    if shared:
+        timer = current_timer()
+        if timer is not None:
+            timer.add('wait', time.perf_counter() - start, 'identical request in flight')
+    return result
+
+def get_processed_batch(batch: List[Dict[str, Any]], parallel: bool = True) -> List[Dict[str, Any]]:
+    """
+    Fetch and process several requests at once, fetching each distinct source only once
+    
+    Requests for the same source and params share one fetch and each of their formats is
+    computed from the shared raw data. Results already in the result cache are served from it.
+    
+    Args:
+        batch: List of {'source', 'format', 'params'} requests ('format' defaults to 3d_scatter)
+        parallel: Fetch distinct sources on a thread pool instead of one after another
+        
+    Returns:
+        One result per request, in request order; failed requests get an error dict
     """
-    raw_data = data_processor.fetch_data(source, params)
-    return data_processor.process_data(raw_data, format_type) 
\ No newline at end of file
+    results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+    groups: Dict[tuple, List[tuple]] = {}
+    for position, item in enumerate(batch):
+        item = item if isinstance(item, dict) else {}
+        source, format_type, params = item.get('source'), item.get('format', '3d_scatter'), item.get('params') or {}
+        if not isinstance(source, str) or not isinstance(format_type, str) or not isinstance(params, dict):
+            results[position] = {"error": "Each request needs a source, an optional format and optional params object",
+                                 "source": source}
+            continue
+        if format_type in BINARY_FORMATS:
+            results[position] = {"error": f"Binary format {format_type} cannot be batched; request /api/data/{source}",
+                                 "source": source}
+            continue
+        groups.setdefault((source, canonical_params(params)), []).append((position, format_type, params))
+    
+    def run_group(source: str, items: List[tuple]) -> List[tuple]:
+        version = data_processor.get_source_version(source)
+        params = items[0][2]
+        outputs, pending = [], []
+        with timed('cache'):
+            for position, format_type, _ in items:
+                found, cached = data_processor.result_cache.get((source, format_type, canonical_params(params)), version)
+                if found:
+                    outputs.append((position, cached))
+                else:
+                    pending.append((position, format_type))
+        if not pending:
+            return outputs
+        
+        raw_data = data_processor.fetch_data(source, params)
+        for position, format_type in pending:
+            if 'error' in raw_data:
+                outputs.append((position, raw_data))
+                continue
+            result = data_processor.process_data(raw_data, format_type, params)
+            # Errors are never cached so a fixed data file is picked up on the next request
+            if 'error' not in result and version is not None:
+                data_processor.result_cache.put((source, format_type, canonical_params(params)), version, result)
+            outputs.append((position, result))
+        return outputs
+    
+    workers = min(len(groups), BATCH_MAX_WORKERS) if parallel else 1
+    if workers > 1:
+        # Each task runs in a copy of this context so its stages are timed as part of the request
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, run_group, source, items)
+                       for (source, _), items in groups.items()]
+            outputs = [output for future in futures for output in future.result()]
+    else:
+        outputs = [output for (source, _), items in groups.items() for output in run_group(source, items)]
+    
+    for position, result in outputs:
+        results[position] = result
+    return results
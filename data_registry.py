@@ -0,0 +1,206 @@
+"""
+Data Source Registry for Signpost Observatory
+Discovers the data sources declared in project configs and resolves them to their files once
+"""
+
+import os
+import glob
+import json
+import fnmatch
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from data_schema import FrameSchema
+
+logger = logging.getLogger(__name__)
+
+# Projects declare their sources in data/projects/<project>/metadata/project_config.json
+PROJECTS_DIR = "data/projects"
+PROJECT_CONFIG_PATH = os.path.join("metadata", "project_config.json")
+
+# Formats and params advertised for CSV sources that do not declare their own
+DEFAULT_CSV_FORMATS = ['3d_scatter', 'heatmap', 'geo_heatmap']
+DEFAULT_CSV_PARAMS = {
+    'limit': 'Number of records to include (default: all)'
+}
+
+
+class DataSource:
+    """A registered data source: its description plus how to load it"""
+
+    def __init__(self, source_id: str, kind: str, name: str, description: str = "",
+                 formats: Optional[List[str]] = None, params: Optional[Dict[str, str]] = None,
+                 loader: Optional[Callable] = None, project: Optional[str] = None,
+                 data_type: Optional[str] = None, raw_dir: Optional[str] = None,
+                 config: Optional[Dict[str, Any]] = None):
+        self.source_id = source_id
+        self.kind = kind
+        self.name = name
+        self.description = description
+        self.formats = formats or []
+        self.params = params or {}
+        self.loader = loader
+        self.project = project
+        self.data_type = data_type
+        self.raw_dir = raw_dir
+        self.config = config or {}
+        self.schema = FrameSchema.from_config(self.config)
+        self.files: List[str] = []
+        # mtime of raw_dir when the files were resolved; adding or removing a file changes it
+        self.resolved_mtime_ns: Optional[int] = None
+
+    def describe(self) -> Dict[str, Any]:
+        """Get the public description served by /api/data/sources"""
+        info = {
+            'name': self.name,
+            'description': self.description,
+            'formats': self.formats,
+            'params': self.params
+        }
+        if self.kind == 'csv':
+            info['project'] = self.project
+            info['data_type'] = self.data_type
+            info['available'] = bool(self.files)
+        return info
+
+
+class DataSourceRegistry:
+    """
+    Maps source ids to data sources.
+
+    Built-in sources are registered in code; CSV sources are discovered by scanning every
+    project config once. Each CSV source's files are resolved during the scan, so lookups
+    and dispatch are plain dictionary accesses. A source's files are resolved again whenever
+    its raw directory's mtime changes, so files dropped in while the server runs are picked
+    up; call refresh() after adding projects or editing project configs.
+    """
+
+    def __init__(self, projects_dir: str = PROJECTS_DIR):
+        self.projects_dir = projects_dir
+        self._builtin: Dict[str, DataSource] = {}
+        self._sources: Dict[str, DataSource] = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def register(self, source: DataSource):
+        """Register a built-in source that is not declared in a project config"""
+        with self._lock:
+            self._builtin[source.source_id] = source
+            sources = dict(self._sources)
+            sources[source.source_id] = source
+            self._sources = sources
+
+    def refresh(self):
+        """Rescan the project configs and re-resolve every CSV source's files"""
+        discovered = {}
+        for config_path in sorted(glob.glob(os.path.join(self.projects_dir, "*", PROJECT_CONFIG_PATH))):
+            project = os.path.basename(os.path.dirname(os.path.dirname(config_path)))
+            try:
+                with open(config_path, 'r') as f:
+                    config = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable project config {config_path}: {str(e)}")
+                continue
+
+            for data_type, source_config in config.get('data_sources', {}).items():
+                source = self._csv_source(project, data_type, source_config)
+                if source.source_id in discovered or source.source_id in self._builtin:
+                    logger.warning(f"Duplicate data source id {source.source_id} in {config_path}, skipping")
+                    continue
+                self._resolve(source)
+                discovered[source.source_id] = source
+
+        with self._lock:
+            # Swap in a new dict so readers never see a half-built registry
+            sources = dict(self._builtin)
+            sources.update(discovered)
+            self._sources = sources
+        logger.info(f"Registered {len(self._builtin)} built-in and {len(discovered)} project data sources")
+
+    def get(self, source_id: str) -> Optional[DataSource]:
+        """Get a source by id, or None if it is not registered"""
+        return self._sources.get(source_id)
+
+    def __contains__(self, source_id: str) -> bool:
+        return source_id in self._sources
+
+    def project_sources(self, project: str) -> List[DataSource]:
+        """Get the CSV sources declared by a project"""
+        return [source for source in self._sources.values() if source.kind == 'csv' and source.project == project]
+
+    def files(self, source_id: str, refresh: bool = False) -> List[str]:
+        """
+        Get the resolved CSV files of a source
+
+        Args:
+            source_id: Data source identifier
+            refresh: Re-resolve the files first, e.g. after a file disappeared
+
+        Returns:
+            List of CSV file paths
+        """
+        source = self._sources[source_id]
+        if refresh or self._stale(source):
+            self._resolve(source)
+        if not source.files:
+            raise FileNotFoundError(f"No CSV files found for {source.data_type} in {source.raw_dir}")
+        return source.files
+
+    def describe(self) -> Dict[str, Dict[str, Any]]:
+        """Get the public descriptions of every registered source"""
+        for source in self._sources.values():
+            if source.kind == 'csv' and self._stale(source):
+                self._resolve(source)
+        return {source_id: source.describe() for source_id, source in self._sources.items()}
+
+    def _csv_source(self, project: str, data_type: str, source_config: Dict[str, Any]) -> DataSource:
+        """Build a CSV source from its project config entry"""
+        source_id = source_config.get('source_id', f"{project}_{data_type}".replace('-', '_'))
+        return DataSource(
+            source_id=source_id,
+            kind='csv',
+            name=source_config.get('name', source_id.replace('_', ' ').title()),
+            description=source_config.get('description', ''),
+            formats=source_config.get('formats', DEFAULT_CSV_FORMATS),
+            params=source_config.get('params', DEFAULT_CSV_PARAMS),
+            project=project,
+            data_type=data_type,
+            raw_dir=os.path.join(self.projects_dir, project, "raw"),
+            config=source_config
+        )
+
+    def _resolve(self, source: DataSource):
+        """
+        Resolve a CSV source's files, trying in order: the declared file_pattern, file names
+        containing the data type, the declared fallback_files, then sample_<data type>.csv
+        """
+        raw_dir = source.raw_dir
+        try:
+            source.resolved_mtime_ns = os.stat(raw_dir).st_mtime_ns
+        except OSError:
+            source.resolved_mtime_ns = None
+        if not os.path.isdir(raw_dir):
+            source.files = []
+            return
+
+        csv_names = sorted(name for name in os.listdir(raw_dir) if name.endswith('.csv'))
+        pattern = source.config.get('file_pattern')
+        matches = fnmatch.filter(csv_names, pattern) if pattern else []
+        if not matches:
+            matches = [name for name in csv_names if source.data_type in name.lower()]
+        if not matches:
+            matches = [name for name in source.config.get('fallback_files', []) if name in csv_names]
+        if not matches:
+            sample_name = f"sample_{source.data_type}.csv"
+            matches = [sample_name] if sample_name in csv_names else []
+
+        source.files = [os.path.join(raw_dir, name) for name in matches]
+
+    def _stale(self, source: DataSource) -> bool:
+        """Check whether files were added to or removed from a source's raw directory since it was resolved"""
+        try:
+            mtime_ns = os.stat(source.raw_dir).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        return not source.files or mtime_ns != source.resolved_mtime_ns
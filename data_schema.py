@@ -0,0 +1,196 @@
+"""
+Data Schema for Signpost Observatory
+Load-time dtype compaction for CSV sources, seeded from the fields declared in project configs
+"""
+
+import re
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Storage kinds a column can be given: integer and float columns get the smallest dtype that holds
+# their values exactly, category columns are dictionary-encoded, string columns are left as parsed
+FIELD_KINDS = ('integer', 'float', 'category', 'string')
+
+# Likely storage kinds of the field names used in required_fields/optional_fields. They are only
+# hints: a numeric hint is used when every value of the column parses as a number, and the column
+# is kept as parsed otherwise. Declared fields missing here, and columns that are not declared at
+# all, have their kind inferred from the data
+FIELD_HINTS = {
+    'latitude': 'float',
+    'longitude': 'float',
+    'elevation': 'float',
+    'accuracy': 'float',
+    'vehicles_involved': 'integer',
+    'speed_limit': 'integer',
+    'crash_count': 'integer',
+    'type': 'category',
+    'weather': 'category',
+    'road_conditions': 'category',
+    'street_names': 'category',
+    'date': 'string',
+    'time': 'string',
+    'timestamp': 'string'
+}
+
+# Inferred string columns become categoricals when at most this share of their values is distinct
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Bumped whenever compaction rules change, so entries compacted by older rules are parsed again
+COMPACTION_RULES_VERSION = 3
+
+
+def field_name(column: str) -> str:
+    """Normalize a column name to the snake_case used for config fields (e.g. CrashCount -> crash_count)"""
+    name = re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', str(column).strip())
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    """Get the memory held by a DataFrame's columns, including the strings they reference"""
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+class FrameSchema:
+    """
+    Picks compact dtypes for the columns of a parsed CSV.
+
+    Integers are downcast to the smallest signed type holding their range and floats to
+    float32 only where every value survives the round trip, so the records served stay
+    identical. Repetitive strings (e.g. intersection names repeated across crash rows)
+    are stored as categoricals.
+    """
+
+    def __init__(self, fields: Optional[Dict[str, Optional[str]]] = None,
+                 category_max_unique_ratio: float = CATEGORY_MAX_UNIQUE_RATIO,
+                 overrides: Optional[Dict[str, str]] = None):
+        self.fields = fields or {}
+        self.category_max_unique_ratio = category_max_unique_ratio
+        # Kinds forced by a config's dtypes mapping; only these may turn unparseable text into missing values
+        self.overrides = overrides or {}
+
+    @classmethod
+    def from_config(cls, source_config: Dict[str, Any]) -> "FrameSchema":
+        """
+        Build the schema of a source from its project config entry
+
+        Args:
+            source_config: Entry under data_sources; required_fields and optional_fields seed
+                the field kinds and an optional dtypes mapping ({column or field: kind}) overrides them
+
+        Returns:
+            The source's schema
+        """
+        fields = {}
+        for name in source_config.get('required_fields', []) + source_config.get('optional_fields', []):
+            fields[field_name(name)] = FIELD_HINTS.get(field_name(name))
+        overrides = {}
+        for name, kind in source_config.get('dtypes', {}).items():
+            if kind not in FIELD_KINDS:
+                raise ValueError(f"Unsupported dtype kind for {name}: {kind}")
+            overrides[field_name(name)] = kind
+        return cls(fields, overrides=overrides)
+
+    @property
+    def key(self) -> str:
+        """Get a short hash identifying the schema, stored with cache entries compacted by it"""
+        spec = json.dumps([COMPACTION_RULES_VERSION, self.fields, self.overrides, self.category_max_unique_ratio],
+                          sort_keys=True)
+        return hashlib.sha1(spec.encode("utf-8")).hexdigest()[:16]
+
+    def compact(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Get a copy of a DataFrame with every column in its most compact lossless dtype"""
+        columns = {}
+        for name, col in df.items():
+            field = field_name(name)
+            forced = field in self.overrides
+            kind = self.overrides[field] if forced else self.fields.get(field)
+            columns[name] = self._compact_column(col, kind, forced)
+        return pd.DataFrame(columns, index=df.index, copy=False)
+
+    def _compact_column(self, col: pd.Series, kind: Optional[str], forced: bool = False) -> pd.Series:
+        if kind == 'string' or isinstance(col.dtype, pd.CategoricalDtype):
+            return col
+        if pd.api.types.is_bool_dtype(col):
+            return col
+        if kind in ('integer', 'float'):
+            numeric = self._coerce_numeric(col, kind, forced)
+            if numeric is None:
+                # A hinted numeric field holding text (e.g. severity as "Personal Injury") is kept as parsed
+                kind = None
+            else:
+                col = numeric
+        if pd.api.types.is_integer_dtype(col):
+            return pd.to_numeric(col, downcast='integer')
+        if pd.api.types.is_float_dtype(col):
+            if col.dtype == np.float64:
+                narrow = col.astype(np.float32)
+                if np.array_equal(narrow.to_numpy(dtype=np.float64), col.to_numpy(), equal_nan=True):
+                    return narrow
+            return col
+        if pd.api.types.is_object_dtype(col) or pd.api.types.is_string_dtype(col):
+            if kind == 'category' or (kind is None and self._repetitive(col)):
+                return col.astype('category')
+        return col
+
+    def _coerce_numeric(self, col: pd.Series, kind: str, forced: bool = False) -> Optional[pd.Series]:
+        """
+        Parse a column of an integer or float field as numbers
+
+        A column forced numeric by the config's dtypes has stray text (e.g. "N/A") turned into
+        missing values; a hinted one is only parsed when every present value is a number.
+        Forced integer columns that parsed as floats become int64 when every value is a whole
+        number and none is missing; forced float columns that parsed as integers become float64.
+
+        Returns:
+            The numeric column, or None when a hinted column holds values that are not numbers
+        """
+        if not pd.api.types.is_numeric_dtype(col):
+            numeric = pd.to_numeric(col, errors='coerce')
+            if not forced and numeric.isna().sum() != col.isna().sum():
+                return None
+            col = numeric
+        if not forced:
+            return col
+        if kind == 'float' and pd.api.types.is_integer_dtype(col):
+            return col.astype(np.float64)
+        if kind == 'integer' and pd.api.types.is_float_dtype(col):
+            values = col.to_numpy(dtype=np.float64)
+            # Beyond 2**53 floats no longer hold every integer, so their values may already be rounded
+            if (len(values) and not np.isnan(values).any() and np.abs(values).max() <= 2 ** 53
+                    and np.array_equal(values, np.trunc(values))):
+                return col.astype(np.int64)
+        return col
+
+    def _repetitive(self, col: pd.Series) -> bool:
+        """Check whether few enough distinct values repeat for a categorical to save memory"""
+        if len(col) < 2:
+            return False
+        return col.nunique(dropna=True) <= len(col) * self.category_max_unique_ratio
+
+
+def unify_categories(frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    """
+    Give each categorical column the same categories in every frame, so concatenating the
+    frames keeps it categorical instead of falling back to object strings
+    """
+    names = []
+    for frame in frames:
+        names.extend(name for name, col in frame.items()
+                     if isinstance(col.dtype, pd.CategoricalDtype) and name not in names)
+
+    for name in names:
+        parts = [frame[name] for frame in frames if name in frame.columns]
+        if len(set(part.dtype for part in parts)) == 1:
+            continue
+        categories = None
+        for part in parts:
+            values = part.cat.categories if isinstance(part.dtype, pd.CategoricalDtype) else pd.Index(part.dropna().unique())
+            categories = values if categories is None else categories.append(values[~values.isin(categories)])
+        dtype = pd.CategoricalDtype(categories)
+        frames = [frame.assign(**{name: frame[name].astype(dtype)}) if name in frame.columns else frame
+                  for frame in frames]
+    return frames
@@ -0,0 +1,270 @@
+"""
+HTTP Caching for Signpost Observatory
+Validators (ETag / Last-Modified), conditional GET handling and precompressed bodies for API responses
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Response, request
+
+from request_timing import timed
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    # Brotli is optional; clients then get gzip, which every browser accepts
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Directory scanned by discover_levels(); its file versions validate the level listings
+LEVELS_DIR = 'public/levels'
+
+# Clients may store responses but must revalidate them before every use
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Content codings offered in order of preference
+COMPRESSION_ENCODINGS = (['br'] if BROTLI_AVAILABLE else []) + ['gzip']
+
+# Bodies smaller than this are sent as-is; compressing them saves less than it costs
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/plain', 'text/csv')
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Precompressed bodies kept per (ETag, coding), bounded by their total size
+COMPRESSED_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+
+def make_etag(*parts: Any) -> str:
+    """Hash the parts a response depends on into a strong ETag value"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def content_hash(payload: Any) -> str:
+    """Hash a small JSON-serializable payload (e.g. the in-memory portal config)"""
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def levels_version(levels_dir: str = LEVELS_DIR) -> Tuple[tuple, Optional[datetime]]:
+    """
+    Get the version of the level files from their stats alone, without reading them
+
+    Directory mtimes are included so added, removed and renamed levels change the version.
+
+    Returns:
+        Tuple of (version tuple, latest modification time or None if there are no levels)
+    """
+    if not os.path.isdir(levels_dir):
+        return (), None
+    entries = [('.', os.stat(levels_dir).st_mtime_ns, 0)]
+    for category in sorted(os.listdir(levels_dir)):
+        category_path = os.path.join(levels_dir, category)
+        if not os.path.isdir(category_path):
+            continue
+        entries.append((category, os.stat(category_path).st_mtime_ns, 0))
+        for filename in sorted(os.listdir(category_path)):
+            if filename.endswith('.html'):
+                stat = os.stat(os.path.join(category_path, filename))
+                entries.append((f"{category}/{filename}", stat.st_mtime_ns, stat.st_size))
+    latest = max(mtime_ns for _, mtime_ns, _ in entries)
+    return tuple(entries), datetime.fromtimestamp(latest / 1e9, tz=timezone.utc)
+
+
+class ChangeClock:
+    """
+    Remembers when each named in-memory value was first seen with its current hash.
+
+    In-memory config such as the portal list has no file to take a Last-Modified time
+    from, so the time its content hash last changed is used instead.
+    """
+
+    def __init__(self):
+        self._seen: Dict[str, Tuple[str, datetime]] = {}
+        self._lock = threading.Lock()
+
+    def changed_at(self, name: str, value_hash: str) -> datetime:
+        """Get the time the named value took on this hash"""
+        with self._lock:
+            seen = self._seen.get(name)
+            if seen is None or seen[0] != value_hash:
+                seen = (value_hash, datetime.now(timezone.utc))
+                self._seen[name] = seen
+            return seen[1]
+
+
+def representation_etag(etag: str, encoding: Optional[str]) -> str:
+    """Get the ETag of one coding of a response; strong ETags must differ between codings"""
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """
+    Answer a conditional GET without building the response body
+
+    If-None-Match takes precedence and matches the ETag of any coding of the response;
+    If-Modified-Since is only used when no ETag was sent.
+
+    Returns:
+        A 304 response carrying the validators, or None if the client's copy is stale
+    """
+    matched = None
+    if request.if_none_match:
+        candidates = [etag] + [representation_etag(etag, encoding) for encoding in COMPRESSION_ENCODINGS]
+        matched = next((candidate for candidate in candidates if request.if_none_match.contains(candidate)), None)
+        fresh = matched is not None
+    elif request.if_modified_since and last_modified is not None:
+        # HTTP dates have whole-second precision
+        fresh = last_modified.replace(microsecond=0) <= request.if_modified_since
+    else:
+        fresh = False
+    if not fresh:
+        return None
+    response = set_validators(Response(status=304), etag, last_modified)
+    if matched is not None:
+        response.set_etag(matched)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def set_validators(response: Response, etag: Optional[str], last_modified: Optional[datetime] = None) -> Response:
+    """Attach a strong ETag (if given), Last-Modified and a revalidate-before-use Cache-Control to a response"""
+    if etag:
+        response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(microsecond=0)
+    response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Pick the preferred content coding the client accepts, or None for an uncompressed body"""
+    encoding = request.accept_encodings.best_match(COMPRESSION_ENCODINGS)
+    return encoding if encoding in COMPRESSION_ENCODINGS else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with a content coding"""
+    with timed('compress', encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=BROTLI_QUALITY)
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressedBodyCache:
+    """
+    Bounded LRU cache of compressed response bodies keyed by (ETag, coding).
+
+    The ETag already identifies the data version, format and params of a response, so a
+    repeat request for a cached body skips the fetch, the serialization and the
+    compression. Bodies of old versions are never served and age out of the LRU.
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSED_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, etag: str, encoding: str) -> Optional[Tuple[bytes, str]]:
+        """Get a cached (body, mimetype), or None"""
+        with self._lock:
+            entry = self._entries.get((etag, encoding))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((etag, encoding))
+            self.hits += 1
+            return entry
+
+    def put(self, etag: str, encoding: str, body: bytes, mimetype: str):
+        """Store a compressed body, evicting the least recently used bodies when over size"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((etag, encoding), None)
+            if previous is not None:
+                self.bytes -= len(previous[0])
+            self._entries[(etag, encoding)] = (body, mimetype)
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'encodings': COMPRESSION_ENCODINGS,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+
+# Global compressed body cache
+compressed_bodies = CompressedBodyCache()
+
+
+def cached_response(etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """
+    Serve a precompressed body for a response's validators, if one is cached
+
+    Returns:
+        The full response, or None when the client wants no compression or nothing is cached
+    """
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return None
+    cached = compressed_bodies.get(etag, encoding)
+    if cached is None:
+        return None
+    body, mimetype = cached
+    response = Response(body, mimetype=mimetype)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    set_validators(response, etag, last_modified)
+    response.set_etag(representation_etag(etag, encoding))
+    return response
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compress a large JSON response with the client's preferred coding
+
+    Responses carrying an ETag are compressed once per coding and kept in the compressed
+    body cache; the rest are compressed per request.
+    """
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    body = response.get_data()
+    if encoding is None or len(body) < COMPRESS_MIN_BYTES:
+        return response
+
+    compressed = compress(body, encoding)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        compressed_bodies.put(etag, encoding, compressed, response.mimetype)
+        response.set_etag(representation_etag(etag, encoding))
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -87,6 +87,81 @@ def show_project(args):
     
     print(f"\n🚀 View: http://localhost:5000/levels/{args.category}/{args.name}")
 
+def ingest_data(args):
+    """Parse new or appended raw CSV rows of a data project into the cache"""
+    # Imported here so the level commands do not pay for loading pandas
+    from data_processing import data_processor
+    
+    try:
+        report = data_processor.ingest_project(args.project)
+    except Exception as e:
+        print(f"❌ Error ingesting project: {str(e)}")
+        sys.exit(1)
+    
+    print(f"📥 Ingest: {args.project}")
+    print("=" * 50)
+    
+    icons = {'unchanged': '⚪', 'appended': '🟢', 'parsed': '🔵', 'missing': '🟡'}
+    for entry in report:
+        print(f"  {icons[entry['status']]} {entry['source']}: {entry['status']}")
+        if entry['file']:
+            print(f"     📁 {entry['file']}")
+            print(f"     ➕ {entry['rows_added']} new rows, {entry['total_rows']} total ({entry['seconds']:.2f}s)")
+        else:
+            print(f"     📭 No raw CSV files found")
+
+def warm_cache(args):
+    """Precompute common (source, format) results and parse raw data into the cache"""
+    # Imported here so the level commands do not pay for loading pandas
+    from cache_warmup import cache_warmer
+    
+    tasks = cache_warmer.tasks(args.source, args.format)
+    if not tasks:
+        print("📭 Nothing to warm")
+        return
+    
+    print(f"🔥 Warming {len(tasks)} cache entries")
+    print("=" * 50)
+    
+    def report(source, format_type, error, seconds):
+        if error:
+            print(f"  ❌ {source} / {format_type}: {error}")
+        else:
+            print(f"  ✅ {source} / {format_type} ({seconds:.2f}s)")
+    
+    status = cache_warmer.run(tasks, on_progress=report, persist=True)
+    print(f"\n📊 {status['completed'] - status['failed']}/{status['total']} succeeded in {status['elapsed_seconds']:.2f}s")
+    if status['failed']:
+        sys.exit(1)
+
+def run_bench(args):
+    """Benchmark the data pipeline on synthetic CSVs and write the results as JSON"""
+    # Imported here so the level commands do not pay for loading pandas
+    from benchmark import run_benchmarks
+    
+    print("⏱️  Benchmarking the data pipeline")
+    print("=" * 50)
+    
+    def report(result):
+        print(f"\n📏 {result['rows']:,} rows ({result['file_bytes'] / 1e6:.1f} MB CSV)")
+        if result.get('error'):
+            print(f"  ❌ {result['error']}")
+        for stage, timing in result['stages'].items():
+            line = f"  {stage:<28} {timing['seconds']:>8.3f}s"
+            if timing.get('error'):
+                line += f"  ❌ {timing['error']}"
+            elif timing['peak_rss_mb'] is not None:
+                line += f"  peak {timing['peak_rss_mb']:,.0f} MB"
+            print(line)
+    
+    try:
+        result = run_benchmarks(args.sizes, args.format, args.output, on_result=report)
+    except Exception as e:
+        print(f"❌ Error running benchmarks: {str(e)}")
+        sys.exit(1)
+    
+    print(f"\n💾 Results written to {result['output']}")
+
 def main():
     parser = argparse.ArgumentParser(
         description="Signpost Observatory Project Management CLI",
@@ -97,6 +172,9 @@ Examples:
   python manage.py create --name "democracy-sim" --category "democracy" --title "Democracy Simulator"
   python manage.py list
   python manage.py show --category "analysis" --name "attention-economy-exchange"
+  python manage.py ingest --project "kansas-city-crashes"
+  python manage.py warm --source "kansas_city_intersections"
+  python manage.py bench --sizes 10000 100000
         """
     )
     
@@ -125,6 +203,24 @@ Examples:
     show_parser.add_argument('--name', required=True, help='Name of the project')
     show_parser.set_defaults(func=show_project)
     
+    # Ingest command
+    ingest_parser = subparsers.add_parser('ingest', help='Cache new or appended raw data of a data project')
+    ingest_parser.add_argument('--project', required=True, help='Data project directory (e.g., "kansas-city-crashes")')
+    ingest_parser.set_defaults(func=ingest_data)
+    
+    # Warm command
+    warm_parser = subparsers.add_parser('warm', help='Precompute common data results into the cache')
+    warm_parser.add_argument('--source', action='append', help='Source to warm (repeatable, default: all)')
+    warm_parser.add_argument('--format', action='append', help='Format to warm (repeatable, default: all advertised)')
+    warm_parser.set_defaults(func=warm_cache)
+    
+    # Bench command
+    bench_parser = subparsers.add_parser('bench', help='Benchmark the data pipeline on synthetic CSVs')
+    bench_parser.add_argument('--sizes', type=int, nargs='+', help='Row counts (default: 10k 100k 1M 10M)')
+    bench_parser.add_argument('--format', action='append', help='Format to benchmark (repeatable)')
+    bench_parser.add_argument('--output', help='Result JSON path (default: data_cache/bench/bench-<timestamp>.json)')
+    bench_parser.set_defaults(func=run_bench)
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -0,0 +1,95 @@
+"""
+Request Timing for Signpost Observatory
+Per-stage timers reported as Server-Timing headers and structured log lines
+"""
+
+import json
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger("signpost.timing")
+
+_current_timer = contextvars.ContextVar('stage_timer', default=None)
+
+
+class StageTimer:
+    """
+    Collects how long each named stage of one request took.
+
+    Repeated stages (e.g. several fetches in one request) are summed under one name, also
+    when they run on worker threads of the same request.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float, description: Optional[str] = None):
+        """Record time spent in a stage"""
+        with self._lock:
+            stage = self.stages.setdefault(name, {'ms': 0.0, 'count': 0, 'desc': None})
+            stage['ms'] += seconds * 1000
+            stage['count'] += 1
+            if description and description not in (stage['desc'] or '').split(','):
+                stage['desc'] = f"{stage['desc']},{description}" if stage['desc'] else description
+
+    def total_ms(self) -> float:
+        """Get the time since the timer started in milliseconds"""
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """Format the stages and the total as a Server-Timing header value"""
+        entries = []
+        for name, stage in self.stages.items():
+            entry = f"{name};dur={stage['ms']:.2f}"
+            if stage['desc']:
+                entry += ';desc="' + stage['desc'].replace('\\', '').replace('"', "'") + '"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.total_ms():.2f}")
+        return ", ".join(entries)
+
+    def log(self, **fields):
+        """Write one structured (JSON) log line with the stage timings and extra fields"""
+        record = dict(fields)
+        record.update({
+            'event': 'request_timing',
+            'total_ms': round(self.total_ms(), 2),
+            'stages': {name: round(stage['ms'], 2) for name, stage in self.stages.items()}
+        })
+        logger.info(json.dumps(record, sort_keys=True, default=str))
+
+
+def start_timer() -> StageTimer:
+    """Start timing the current request; stages recorded in this context go to the new timer"""
+    timer = StageTimer()
+    _current_timer.set(timer)
+    return timer
+
+
+def current_timer() -> Optional[StageTimer]:
+    """Get the timer of the current request, or None outside a timed request"""
+    return _current_timer.get()
+
+
+def clear_timer():
+    """Stop collecting stages for the current context"""
+    _current_timer.set(None)
+
+
+@contextmanager
+def timed(name: str, description: Optional[str] = None) -> Iterator[None]:
+    """Time a block as a stage of the current request (does nothing outside a timed request)"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start, description)
@@ -52,7 +52,8 @@ class SignpostEngine {
         this.utils = {
             vector: this.createVectorUtils(),
             math: this.createMathUtils(),
-            raycast: this.createRaycastUtils()
+            raycast: this.createRaycastUtils(),
+            data: this.createDataUtils()
         };
         
         console.log('🚀 Signpost Engine initialized');
@@ -411,6 +412,47 @@ class SignpostEngine {
         };
     }
     
+    createDataUtils() {
+        const typedArrays = {
+            float32: Float32Array,
+            uint8: Uint8Array,
+            uint16: Uint16Array,
+            uint32: Uint32Array
+        };
+        
+        const decodePointCloud = (buffer) => {
+            // Layout: 'SPC1' magic, uint32 header length, JSON header, 4-byte aligned arrays
+            const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 4));
+            if (magic !== 'SPC1') {
+                throw new Error('Not a Signpost point cloud buffer');
+            }
+            
+            const headerLength = new DataView(buffer).getUint32(4, true);
+            const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+            
+            // Views share the response buffer, so nothing is copied
+            const arrays = {};
+            Object.entries(header.buffers).forEach(([name, layout]) => {
+                arrays[name] = new typedArrays[layout.type](buffer, layout.offset, layout.length);
+            });
+            
+            return { header, ...arrays };
+        };
+        
+        return {
+            decodePointCloud,
+            
+            loadPointCloud: async (source, params = {}) => {
+                const query = new URLSearchParams({ format: '3d_scatter_bin', params: JSON.stringify(params) });
+                const response = await fetch(`/api/data/${source}?${query}`);
+                if (!response.ok) {
+                    throw new Error(`Failed to load point cloud: ${response.status}`);
+                }
+                return decodePointCloud(await response.arrayBuffer());
+            }
+        };
+    }
+    
     /**
      * Performance monitoring
      */
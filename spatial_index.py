@@ -0,0 +1,287 @@
+"""
+Spatial Index for Signpost Observatory
+Uniform grid index for bbox, radius and nearest-neighbour queries, and a quadtree for level-of-detail tiles
+"""
+
+import math
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+# Average number of points per grid cell the index aims for
+TARGET_POINTS_PER_CELL = 8
+
+
+def haversine_m(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distance in meters from one point to arrays of points"""
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs) - math.radians(lng)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    """
+    Uniform grid over lat/lng points.
+
+    Points are sorted by cell (row-major), so every row of cells covered by a query
+    is one contiguous slice of the sorted arrays. Query results are positions into
+    the arrays the index was built from.
+    """
+
+    def __init__(self, lats: np.ndarray, lngs: np.ndarray):
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        valid = np.flatnonzero(np.isfinite(lats) & np.isfinite(lngs))
+        self.size = len(valid)
+
+        if self.size:
+            self.min_lat, self.max_lat = float(lats[valid].min()), float(lats[valid].max())
+            self.min_lng, self.max_lng = float(lngs[valid].min()), float(lngs[valid].max())
+        else:
+            self.min_lat = self.max_lat = self.min_lng = self.max_lng = 0.0
+
+        # Pick a grid shape matching the data's aspect ratio with ~TARGET_POINTS_PER_CELL per cell
+        lat_span = max(self.max_lat - self.min_lat, 1e-9)
+        lng_span = max(self.max_lng - self.min_lng, 1e-9)
+        cells = max(self.size // TARGET_POINTS_PER_CELL, 1)
+        self.cols = max(int(math.sqrt(cells * lng_span / lat_span)), 1)
+        self.rows = max(cells // self.cols, 1)
+        self.cell_lat = lat_span / self.rows
+        self.cell_lng = lng_span / self.cols
+
+        cell_ids = self._cell_rows(lats[valid]) * self.cols + self._cell_cols(lngs[valid])
+        order = np.argsort(cell_ids, kind="stable")
+        self.positions = valid[order]
+        self.lats = lats[self.positions]
+        self.lngs = lngs[self.positions]
+        self.cell_start = np.searchsorted(cell_ids[order], np.arange(self.rows * self.cols + 1))
+
+    def _cell_rows(self, lats: np.ndarray) -> np.ndarray:
+        return np.clip(((lats - self.min_lat) / self.cell_lat).astype(np.int64), 0, self.rows - 1)
+
+    def _cell_cols(self, lngs: np.ndarray) -> np.ndarray:
+        return np.clip(((lngs - self.min_lng) / self.cell_lng).astype(np.int64), 0, self.cols - 1)
+
+    def _candidates(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> np.ndarray:
+        """Get sorted-array offsets of every point in the cells overlapping a bbox"""
+        if (not self.size or max_lat < self.min_lat or min_lat > self.max_lat
+                or max_lng < self.min_lng or min_lng > self.max_lng):
+            return np.empty(0, dtype=np.int64)
+
+        row0, row1 = self._cell_rows(np.array([min_lat, max_lat]))
+        col0, col1 = self._cell_cols(np.array([min_lng, max_lng]))
+        slices = [np.arange(self.cell_start[row * self.cols + col0], self.cell_start[row * self.cols + col1 + 1])
+                  for row in range(row0, row1 + 1)]
+        return np.concatenate(slices)
+
+    def bbox(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> np.ndarray:
+        """Get positions of the points inside a bbox, in ascending order"""
+        offsets = self._candidates(min_lat, min_lng, max_lat, max_lng)
+        lats, lngs = self.lats[offsets], self.lngs[offsets]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
+        return np.sort(self.positions[offsets[inside]])
+
+    def radius(self, lat: float, lng: float, meters: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the points within a distance of a location, nearest first
+
+        Returns:
+            Tuple of (positions, distances in meters)
+        """
+        # Exact bounding box of a great-circle radius
+        angular = meters / EARTH_RADIUS_M
+        dlat = math.degrees(angular)
+        ratio = math.sin(angular) / max(math.cos(math.radians(lat)), 1e-12)
+        dlng = math.degrees(math.asin(ratio)) if ratio < 1 and abs(lat) + dlat < 90 else 360.0
+        offsets = self._candidates(lat - dlat, lng - dlng, lat + dlat, lng + dlng)
+        distances = haversine_m(lat, lng, self.lats[offsets], self.lngs[offsets])
+        inside = distances <= meters
+        offsets, distances = offsets[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return self.positions[offsets[order]], distances[order]
+
+    def nearest(self, lat: float, lng: float, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the k points nearest to a location, nearest first
+
+        Returns:
+            Tuple of (positions, distances in meters)
+        """
+        k = min(k, self.size)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Grow a square of cells around the location until it holds k points; the k-th
+        # distance found there bounds the true k-th distance, so one radius query is exact
+        row = int(self._cell_rows(np.array([lat]))[0])
+        col = int(self._cell_cols(np.array([lng]))[0])
+        ring = 0
+        while True:
+            offsets = self._candidates(
+                self.min_lat + (row - ring) * self.cell_lat, self.min_lng + (col - ring) * self.cell_lng,
+                self.min_lat + (row + ring + 1) * self.cell_lat, self.min_lng + (col + ring + 1) * self.cell_lng
+            )
+            if len(offsets) >= k:
+                break
+            ring = ring * 2 + 1
+
+        distances = haversine_m(lat, lng, self.lats[offsets], self.lngs[offsets])
+        kth_distance = np.partition(distances, k - 1)[k - 1]
+        positions, distances = self.radius(lat, lng, kth_distance)
+        return positions[:k], distances[:k]
+
+
+# Deepest zoom level of the tile quadtree (Web Mercator XYZ scheme)
+TILE_MAX_ZOOM = 20
+
+# Tiles holding at most this many points are served raw; larger tiles are aggregated
+TILE_MAX_POINTS = 1000
+
+# Aggregated tiles are split into 2^TILE_AGGREGATION_LEVELS cells per side
+TILE_AGGREGATION_LEVELS = 5
+
+MAX_MERCATOR_LAT = 85.0511287798
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """Insert a zero bit between each of the low 32 bits of each value"""
+    v = values.astype(np.uint64)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+
+def morton_code(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Interleave tile x/y coordinates into quadtree (Z-order) codes"""
+    return _spread_bits(x) | (_spread_bits(y) << np.uint64(1))
+
+
+def tile_coordinates(lats: np.ndarray, lngs: np.ndarray, zoom: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the Web Mercator tile x/y containing each point at a zoom level"""
+    n = 2 ** zoom
+    lat_rad = np.radians(np.clip(lats, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x = np.floor((lngs + 180.0) / 360.0 * n)
+    y = np.floor((1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / math.pi) / 2.0 * n)
+    return np.clip(x, 0, n - 1).astype(np.int64), np.clip(y, 0, n - 1).astype(np.int64)
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Get the (min_lat, min_lng, max_lat, max_lng) bounds of a tile"""
+    n = 2 ** z
+
+    def lat_at(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return lat_at(y + 1), x / n * 360.0 - 180.0, lat_at(y), (x + 1) / n * 360.0 - 180.0
+
+
+class TileIndex:
+    """
+    Linear quadtree over lat/lng points in the Web Mercator XYZ tile scheme.
+
+    Points are sorted by their Z-order code at TILE_MAX_ZOOM, so every tile at every
+    zoom level is one contiguous range of the sorted arrays, found by binary search.
+    """
+
+    def __init__(self, lats: np.ndarray, lngs: np.ndarray, weights: np.ndarray = None):
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        valid = np.flatnonzero(np.isfinite(lats) & np.isfinite(lngs))
+        self.size = len(valid)
+        self.length = len(lats)
+
+        x, y = tile_coordinates(lats[valid], lngs[valid], TILE_MAX_ZOOM)
+        codes = morton_code(x, y)
+        order = np.argsort(codes, kind="stable")
+        self.codes = codes[order]
+        self.positions = valid[order]
+        self.lats = lats[self.positions]
+        self.lngs = lngs[self.positions]
+        self.weights = None
+        if weights is not None:
+            self.weights = np.nan_to_num(np.asarray(weights, dtype=np.float64)[self.positions])
+
+        if self.size:
+            self.bounds = (float(self.lats.min()), float(self.lngs.min()),
+                           float(self.lats.max()), float(self.lngs.max()))
+        else:
+            self.bounds = None
+
+    def extend(self, lats: np.ndarray, lngs: np.ndarray, weights: np.ndarray = None) -> "TileIndex":
+        """
+        Get a new index that also holds points appended after the indexed arrays
+
+        The appended points are merged into the sorted arrays without re-sorting them,
+        giving the same result as a full rebuild over the combined arrays.
+        """
+        appended = TileIndex(lats, lngs, weights)
+
+        # Equal codes keep the existing points first, as the stable sort in __init__ would
+        slots = np.searchsorted(self.codes, appended.codes, side="right")
+        merged = TileIndex.__new__(TileIndex)
+        merged.size = self.size + appended.size
+        merged.length = self.length + appended.length
+        merged.codes = np.insert(self.codes, slots, appended.codes)
+        merged.positions = np.insert(self.positions, slots, appended.positions + self.length)
+        merged.lats = np.insert(self.lats, slots, appended.lats)
+        merged.lngs = np.insert(self.lngs, slots, appended.lngs)
+        merged.weights = None
+        if self.weights is not None and appended.weights is not None:
+            merged.weights = np.insert(self.weights, slots, appended.weights)
+
+        if self.bounds is None or appended.bounds is None:
+            merged.bounds = self.bounds or appended.bounds
+        else:
+            merged.bounds = (min(self.bounds[0], appended.bounds[0]), min(self.bounds[1], appended.bounds[1]),
+                             max(self.bounds[2], appended.bounds[2]), max(self.bounds[3], appended.bounds[3]))
+        return merged
+
+    def _tile_range(self, z: int, x: int, y: int) -> Tuple[int, int]:
+        """Get the [start, end) range of sorted points inside a tile"""
+        if not 0 <= z <= TILE_MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError(f"Invalid tile: {z}/{x}/{y}")
+        shift = np.uint64(2 * (TILE_MAX_ZOOM - z))
+        prefix = morton_code(np.array([x]), np.array([y]))[0]
+        start, end = np.searchsorted(self.codes, [prefix << shift, (prefix + np.uint64(1)) << shift])
+        return int(start), int(end)
+
+    def count(self, z: int, x: int, y: int) -> int:
+        """Get the number of points inside a tile"""
+        start, end = self._tile_range(z, x, y)
+        return end - start
+
+    def tile(self, z: int, x: int, y: int, max_points: int = TILE_MAX_POINTS) -> Dict[str, Any]:
+        """
+        Get the contents of a tile
+
+        Tiles with at most max_points points return their positions; larger tiles are
+        aggregated into a grid of sub-tiles, each reported as a centroid with its point
+        count, summed weight and the position of a representative point.
+        """
+        start, end = self._tile_range(z, x, y)
+        if end - start <= max_points or z >= TILE_MAX_ZOOM:
+            return {'aggregated': False, 'count': end - start, 'positions': self.positions[start:end]}
+
+        # Sub-tiles are contiguous runs of codes sharing a longer prefix
+        level = min(z + TILE_AGGREGATION_LEVELS, TILE_MAX_ZOOM)
+        prefixes = self.codes[start:end] >> np.uint64(2 * (TILE_MAX_ZOOM - level))
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(prefixes)) + 1))
+        counts = np.diff(np.append(starts, end - start))
+
+        cells = {
+            'count': counts,
+            'lat': np.add.reduceat(self.lats[start:end], starts) / counts,
+            'lng': np.add.reduceat(self.lngs[start:end], starts) / counts,
+            'representative': self.positions[start:end][starts]
+        }
+        if self.weights is not None:
+            cells['weight'] = np.add.reduceat(self.weights[start:end], starts)
+        return {'aggregated': True, 'count': end - start, 'level': level, 'cells': cells}